@@ -1,46 +1,141 @@
-import requests
-import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta
 import json
 import threading
+import argparse
+import asyncio
 from collections import deque
+from itertools import islice
 import warnings
+from exchange_client import (
+    BinanceClient, BINANCE_API_URL, EXCHANGE_INFO_WEIGHT, KLINES_WEIGHT, TICKER_24HR_ALL_WEIGHT,
+    MAX_KLINES_LIMIT, INTERVAL_MS, OPEN_TIME, CLOSE, HIGH, LOW, VOLUME,
+    parse_ticker_volumes, parse_klines, top_n_indices
+)
+from candle_cache import CandleCache
+from kline_store import KlineStore, backfill, closed_rows
+from scoring_rules import ScoringRules, DEFAULT_RULES_PATH
+from sharding import ShardWorkerPool, shard_of
+from kline_stream import KlineStreamer, BINANCE_WS_URL
+from indicators import compute_indicator_matrix, MIN_CANDLES, IncrementalIndicators
+from metrics import Metrics, MetricsServer, Profiler
+from signal_store import SignalStore
+from scheduler import CandleScheduler
+from timeframes import TimeframeCache, TIMEFRAME_INDICATORS, parse_timeframe, required_candles
+from screening import TickerPrefilter
 warnings.filterwarnings('ignore')
 
-print("🚀 ADVANCED CRYPTO TRADING BOT - ULTIMATE VERSION")
-print("📊 Real-time Analysis - All Cryptocurrencies")
-print("🎯 High Frequency Signals - Tested & Proven")
-print("=" * 70)
+# وصف قياسات البوت في /metrics (# HELP)
+BOT_METRICS = {
+    'bot_cycles_total': 'Completed analysis cycles',
+    'bot_cycle_duration_seconds': 'Duration of full analysis cycles',
+    'bot_last_cycle_duration_seconds': 'Duration of the last analysis cycle',
+    'bot_cycle_interval_seconds': 'Configured seconds between analysis cycles',
+    'bot_cycle_overruns_total': 'Cycles that took longer than the cycle interval',
+    'bot_cycle_symbols': 'Symbols analysed in the last cycle',
+    'bot_screen_symbols': 'Symbols per screening tier in the last cycle',
+    'bot_stage_duration_seconds': 'Duration of each analysis stage',
+    'bot_deadline_misses_total': 'Cycles that hit their deadline before analysing every symbol',
+    'bot_skipped_symbols_total': 'Symbols deferred because of a missed deadline',
+    'bot_signals_total': 'Trading signals generated',
+    'bot_exceptions_total': 'Exceptions caught per stage',
+}
 
 class AdvancedTradingBot:
-    def __init__(self):
+    def __init__(self, base_url=BINANCE_API_URL, fetch_workers=32, ws_url=BINANCE_WS_URL, data_dir=None,
+                 rules_path=DEFAULT_RULES_PATH, load_symbols=True, signals_db=None):
+        # إعدادات الإنشاء (لإنشاء نسخ مماثلة في عمليات التوزيع)
+        self.bot_options = {
+            'base_url': base_url, 'fetch_workers': fetch_workers, 'ws_url': ws_url,
+            'data_dir': data_dir, 'rules_path': rules_path
+        }
+        
         self.all_symbols = []
         self.active_symbols = []
         self.analysis_count = 0
         self.signals_history = deque(maxlen=1000)
+        # سجل الإشارات الدائم (اختياري، تكتبه عملية التنسيق فقط وليس عمليات التوزيع)
+        self.signal_store = SignalStore(signals_db) if signals_db else None
         self.last_analysis_time = None
         self.analysis_interval = 2  # دقائق بين كل تحليل
+        self.active_symbols_count = 50
+        self.symbol_refresh_interval = 30  # دقائق بين كل إعادة ترتيب للعملات
+        self._refresh_stop = threading.Event()
+        self._refresh_thread = None
+        
+        # القياسات الداخلية (مدد المراحل، الأخطاء، وزن API) والتحليل الزمني
+        self.metrics = Metrics()
+        for name, text in BOT_METRICS.items():
+            self.metrics.describe(name, text)
+        self.profiler = Profiler()
+        self.metrics_server = None
+        
+        # عميل HTTP مشترك (اتصالات مُجمّعة + محدد وزن الطلبات)
+        self.client = BinanceClient(base_url, max_workers=fetch_workers, metrics=self.metrics)
+        
+        # مخزن الشموع: كل دورة تجلب فقط الشموع الجديدة
+        self.kline_lookback = 100
+        self.candle_cache = CandleCache(capacity=self.kline_lookback)
+        
+        # الفواصل الأعلى (1h, 4h ...) تُشتق من الشموع المخزنة بدون طلبات إضافية
+        self.timeframes = []
+        self.timeframe_cache = TimeframeCache(capacity=self.kline_lookback)
+        self.short_history = set()  # عملات تاريخها أقصر من المطلوب (لا داعي لإعادة جلبه كاملاً)
+        
+        # مخزن الشموع على القرص (اختياري): بدء سريع وحفظ التاريخ
+        self.kline_store = KlineStore(data_dir) if data_dir else None
+        
+        # وضع البث (WebSocket)
+        self.ws_url = ws_url
+        self.stream_interval = '5m'
+        self.streamer = None
+        self.evaluate_on_tick = False  # تقييم الشمعة قيد التكوين بقيم مؤقتة
+        self.indicator_states = {}     # حالة المؤشرات التزايدية لكل عملة
+        self._tick_signaled = {}       # آخر شمعة صدرت لها إشارة مؤقتة
+        
+        # جدول قواعد النقاط (يحدد أيضاً الفواصل الأعلى المطلوبة مثل rsi_1h)
+        self.scoring_rules = ScoringRules.load(rules_path)
+        
+        # نطاق التحليل والتوزيع
+        self.intervals = ['5m']
+        self.scan_universe = False  # True: تحليل كل العملات وليس النشطة فقط
+        self.shard_index = 0        # جزء هذه النسخة عند تشغيل عدة نسخ
+        self.shard_count = 1
+        self.shard_pool = None
+        self.set_timeframes([])
+        
+        # الفرز على مرحلتين: فلتر ticker لكل السوق ثم تحليل المرشحين فقط
+        self.prefilter = None        # TickerPrefilter عند تفعيل --universe screen
+        self.screened = []           # مرشحو آخر فرز (ومنهم تُختار العملات الساخنة)
+        
+        # الجدولة على إغلاق الشموع: آخر نقاط وتقلب كل عملة لترتيب الأولوية
+        self.scheduler = CandleScheduler(self.intervals[0])
+        self.last_scores = {}
+        self.last_volatility = {}
+        self.last_seen = {}          # رقم آخر دورة فُحصت فيها العملة
+        self._hot_signaled = set()   # عملات صدرت لها إشارة في فحص سريع منذ آخر فحص كامل
         
         # إحصائيات
         self.stats = {
             'total_analyses': 0,
             'total_signals': 0,
             'strong_signals': 0,
-            'last_signal_time': None
+            'last_signal_time': None,
+            'deadline_misses': 0,
+            'skipped_symbols': 0
         }
         
         # تحميل جميع العملات المتاحة
-        self.load_all_symbols()
+        if load_symbols:
+            self.load_all_symbols()
     
     def load_all_symbols(self):
         """جلب جميع العملات المتاحة من Binance"""
         print("🔍 Loading all available cryptocurrencies...")
         try:
-            url = "https://api.binance.com/api/v3/exchangeInfo"
-            response = requests.get(url, timeout=10)
-            data = response.json()
+            data = self.client.get('/api/v3/exchangeInfo', weight=EXCHANGE_INFO_WEIGHT)
+            self.client.configure_rate_limits(data.get('rateLimits', []))
             
             # تصفية العملات التي بها USDT وتنشطة
             usdt_pairs = [
@@ -71,401 +166,780 @@ class AdvancedTradingBot:
             self.active_symbols = self.all_symbols[:30]
     
     def select_active_symbols(self):
-        """اختيار العملات النشطة بناءً على حجم التداول"""
+        """اختيار العملات النشطة بناءً على حجم التداول (طلب واحد لكل السوق)"""
         print("📈 Selecting most active cryptocurrencies...")
         try:
-            # جلب بيانات الحجم للعملات
-            volume_data = []
-            for symbol in self.all_symbols[:100]:  # تحقق من أول 100 عملة
-                try:
-                    url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={symbol}"
-                    response = requests.get(url, timeout=5)
-                    data = response.json()
-                    volume = float(data.get('quoteVolume', 0))
-                    volume_data.append((symbol, volume))
-                    time.sleep(0.1)  # تجنب حظر API
-                except:
-                    continue
+            # جلب بيانات الحجم لجميع العملات دفعة واحدة
+            tickers = self.client.get('/api/v3/ticker/24hr', weight=TICKER_24HR_ALL_WEIGHT)
+            symbols, volumes = parse_ticker_volumes(tickers, self.all_symbols)
             
-            # ترتيب حسب الحجم واختيار الأعلى
-            volume_data.sort(key=lambda x: x[1], reverse=True)
-            self.active_symbols = [symbol for symbol, vol in volume_data[:50]]
+            # اختيار الأعلى حجماً
+            top = top_n_indices(volumes, self.active_symbols_count)
+            self.active_symbols = symbols[top].tolist()
             print(f"✅ Selected {len(self.active_symbols)} most active pairs")
             
         except Exception as e:
             print(f"⚠️ Using default symbol selection: {e}")
-            self.active_symbols = self.all_symbols[:30]
+            if not self.active_symbols:
+                self.active_symbols = self.all_symbols[:30]
+    
+    def start_symbol_refresh(self):
+        """إعادة ترتيب العملات النشطة دورياً في الخلفية"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        
+        def refresh_loop():
+            while not self._refresh_stop.wait(self.symbol_refresh_interval * 60):
+                self.select_active_symbols()
+        
+        self._refresh_stop.clear()
+        self._refresh_thread = threading.Thread(target=refresh_loop, name='symbol-refresh', daemon=True)
+        self._refresh_thread.start()
+    
+    def stop_symbol_refresh(self):
+        """إيقاف إعادة الترتيب الدورية"""
+        self._refresh_stop.set()
     
-    def get_klines_data(self, symbol, interval='5m', limit=100):
-        """جلب بيانات الشموع"""
+    def get_klines_data(self, symbol, interval='5m', limit=None, closed_only=False):
+        """جلب بيانات الشموع (تزايدياً عبر مخزن الشموع)
+        
+        closed_only: استبعاد الشمعة قيد التكوين (للفحص بعد الإغلاق مباشرة).
+        """
         try:
-            url = "https://api.binance.com/api/v3/klines"
+            limit = limit or self.kline_lookback
+            # شمعة إضافية حتى يبقى limit شمعة مغلقة عند استبعاد الشمعة قيد التكوين
+            depth = max(limit + 1, self.history_depth(interval))  # وما تحتاجه الفواصل الأعلى
+            buffer = self.candle_cache.get(symbol, interval)
+            if self.kline_store is not None and not len(buffer):
+                self.hydrate_from_store(symbol, interval, buffer)
+            
             params = {
                 'symbol': symbol,
                 'interval': interval,
-                'limit': limit
+                'limit': min(depth, MAX_KLINES_LIMIT)
             }
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
             
-            if not data:
+            # جلب الشموع بدءاً من آخر شمعة محفوظة فقط (تُستبدل إن كانت قيد التكوين)
+            last_open_time = buffer.last_open_time()
+            complete = len(buffer) >= depth or (symbol, interval) in self.short_history
+            if last_open_time is not None and complete:
+                missing = int(time.time() * 1000 - last_open_time) // INTERVAL_MS[interval] + 1
+                if missing < min(buffer.capacity, MAX_KLINES_LIMIT):
+                    params['startTime'] = int(last_open_time)
+                    params['limit'] = missing + 1
+                else:
+                    buffer.clear()
+            
+            full_fetch = 'startTime' not in params
+            if full_fetch and depth > MAX_KLINES_LIMIT:
+                # أول تحميل لتاريخ أطول من طلب واحد: عدة صفحات (مرة واحدة فقط)
+                start_ms = time.time() * 1000 - depth * INTERVAL_MS[interval]
+                with self.metrics.timer('bot_stage_duration_seconds', stage='fetch'):
+                    pages = list(self.client.klines_since(symbol, interval, start_ms))
+                rows = np.concatenate(pages) if pages else parse_klines([])
+                buffer.update(rows)
+            else:
+                with self.metrics.timer('bot_stage_duration_seconds', stage='fetch'):
+                    data = self.client.get('/api/v3/klines', params=params, weight=KLINES_WEIGHT, raw=True)
+                with self.metrics.timer('bot_stage_duration_seconds', stage='parse'):
+                    rows = parse_klines(data)
+                    buffer.update(rows)
+            
+            if full_fetch:
+                if len(buffer) < depth:
+                    self.short_history.add((symbol, interval))
+                else:
+                    self.short_history.discard((symbol, interval))
+            
+            # حفظ الشموع المغلقة على القرص (إضافة فقط)
+            if self.kline_store is not None:
+                closed = closed_rows(rows, interval)
+                stored = self.kline_store.last_open_time(symbol, interval)
+                if len(closed) and stored is not None and closed[0, OPEN_TIME] > stored + INTERVAL_MS[interval]:
+                    # فجوة أكبر من المخزن (مثلاً عملة عادت للقائمة بعد ساعات): تنزيلها أولاً
+                    backfill(self.client, self.kline_store, symbol, interval, stored)
+                self.kline_store.append(symbol, interval, closed)
+            
+            if not len(buffer):
                 return None
             
-            # استخراج البيانات الأساسية
-            closes = [float(candle[4]) for candle in data]  # سعر الإغلاق
-            highs = [float(candle[2]) for candle in data]   # أعلى سعر
-            lows = [float(candle[3]) for candle in data]    # أقل سعر  
-            volumes = [float(candle[5]) for candle in data] # الحجم
+            # استخراج البيانات الأساسية (بدون نسخ)
+            history = buffer.view()
+            if closed_only and history[OPEN_TIME, -1] + INTERVAL_MS[interval] > time.time() * 1000:
+                history = history[:, :-1]
+            candles = history[:, -limit:]
+            closes = candles[CLOSE]    # سعر الإغلاق
             
             return {
                 'closes': closes,
-                'highs': highs,
-                'lows': lows,
-                'volumes': volumes,
-                'current_price': closes[-1]
+                'highs': candles[HIGH],     # أعلى سعر
+                'lows': candles[LOW],       # أقل سعر
+                'volumes': candles[VOLUME], # الحجم
+                'current_price': float(closes[-1]),
+                'interval': interval,       # يحدد عدد شموع مؤشرات التغير (5m, 1h, 4h)
+                'candles': history          # كل الشموع المخزنة (للفواصل الأعلى)
             }
         except Exception as e:
+            self.metrics.increment('bot_exceptions_total', stage='klines', error=type(e).__name__)
             return None
     
+    def rules_timeframes(self):
+        """الفواصل الأعلى التي تستخدمها قواعد النقاط (مثلاً rsi_1h ← 1h)"""
+        parsed = [parse_timeframe(name) for name in self.scoring_rules.indicator_names()]
+        return sorted({timeframe for _, timeframe in filter(None, parsed)}, key=INTERVAL_MS.get)
+    
+    def set_timeframes(self, timeframes):
+        """تفعيل الفواصل الأعلى (مع ما تستخدمه القواعد) وتكبير مخزن الشموع بما يكفي لتكوينها"""
+        self.timeframes = sorted(set(timeframes) | set(self.rules_timeframes()), key=INTERVAL_MS.get)
+        intervals = set(self.intervals) | {self.stream_interval}
+        depth = max([self.kline_lookback + 1] + [self.history_depth(interval) for interval in intervals])
+        if depth > self.candle_cache.capacity:
+            self.candle_cache = CandleCache(capacity=depth)
+    
+    def derived_timeframes(self, interval):
+        """الفواصل الأعلى التي يمكن اشتقاقها من هذا الفاصل (مضاعفاته فقط)"""
+        base_ms = INTERVAL_MS[interval]
+        return [timeframe for timeframe in self.timeframes
+                if INTERVAL_MS[timeframe] > base_ms and INTERVAL_MS[timeframe] % base_ms == 0]
+    
+    def history_depth(self, interval):
+        """عدد الشموع الأساسية اللازمة لمؤشرات الفواصل الأعلى على هذا الفاصل"""
+        return required_candles(interval, self.derived_timeframes(interval))
+    
+    def timeframe_matrix(self, symbols, candle_views, interval, matrix):
+        """مؤشرات جميع الفواصل الأعلى لمجموعة عملات (مفاتيح بلاحقة الفاصل مثل rsi_1h)"""
+        result = {}
+        for timeframe in self.timeframes:
+            if timeframe in self.derived_timeframes(interval):
+                with self.metrics.timer('bot_stage_duration_seconds', stage='timeframes'):
+                    result.update(self.timeframe_cache.indicator_matrix(symbols, interval, timeframe, candle_views))
+            else:
+                # نفس الفاصل: المؤشرات الأساسية نفسها؛ فاصل أصغر أو غير مضاعف: غير متاح
+                for name in TIMEFRAME_INDICATORS:
+                    values = matrix[name] if timeframe == interval else np.full(len(symbols), np.nan)
+                    result[f"{name}_{timeframe}"] = values
+        return result
+    
+    def hydrate_from_store(self, symbol, interval, buffer):
+        """تحميل الشموع من القرص وجلب الفجوة فقط منذ آخر شمعة محفوظة"""
+        start_ms = time.time() * 1000 - buffer.capacity * INTERVAL_MS[interval]
+        backfill(self.client, self.kline_store, symbol, interval, start_ms)
+        buffer.update(np.column_stack(self.kline_store.tail(symbol, interval, buffer.capacity)))
+    
     def calculate_advanced_indicators(self, data):
         """حساب المؤشرات الفنية المتقدمة"""
+        start = time.perf_counter()
         try:
-            closes = np.array(data['closes'])
-            highs = np.array(data['highs'])
-            lows = np.array(data['lows'])
-            volumes = np.array(data['volumes'])
-            
-            # RSI
-            def calculate_rsi(prices, period=14):
-                deltas = np.diff(prices)
-                gains = np.where(deltas > 0, deltas, 0)
-                losses = np.where(deltas < 0, -deltas, 0)
-                
-                avg_gains = np.convolve(gains, np.ones(period)/period, mode='valid')
-                avg_losses = np.convolve(losses, np.ones(period)/period, mode='valid')
-                
-                rs = avg_gains / (avg_losses + 1e-10)  # تجنب القسمة على صفر
-                rsi = 100 - (100 / (1 + rs))
-                return rsi[-1] if len(rsi) > 0 else 50
-            
-            # المتوسطات المتحركة
-            ema_8 = pd.Series(closes).ewm(span=8).mean().iloc[-1]
-            ema_21 = pd.Series(closes).ewm(span=21).mean().iloc[-1]
-            sma_50 = pd.Series(closes).rolling(50).mean().iloc[-1]
-            
-            # MACD
-            exp1 = pd.Series(closes).ewm(span=12).mean()
-            exp2 = pd.Series(closes).ewm(span=26).mean()
-            macd = exp1 - exp2
-            signal_line = macd.ewm(span=9).mean()
-            macd_histogram = macd - signal_line
-            
-            # Stochastic RSI
-            def stochastic_rsi(rsi_values, period=14):
-                if len(rsi_values) < period:
-                    return 50
-                current_rsi = rsi_values[-1]
-                min_rsi = min(rsi_values[-period:])
-                max_rsi = max(rsi_values[-period:])
-                if max_rsi == min_rsi:
-                    return 50
-                return (current_rsi - min_rsi) / (max_rsi - min_rsi) * 100
-            
-            # حساب جميع المؤشرات
-            rsi = calculate_rsi(closes)
-            
-            # حساب RSI للستوكاستك
-            rsi_values = []
-            for i in range(len(closes) - 14):
-                if i + 14 <= len(closes):
-                    rsi_values.append(calculate_rsi(closes[i:i+14]))
-            stoch_rsi = stochastic_rsi(rsi_values) if rsi_values else 50
-            
-            # حجم التداول
-            volume_avg = np.mean(volumes[-20:])
-            current_volume = volumes[-1]
-            volume_ratio = current_volume / volume_avg if volume_avg > 0 else 1
-            
-            # التقلب
-            atr = np.mean([high - low for high, low in zip(highs[-14:], lows[-14:])])
-            volatility = (atr / data['current_price']) * 100
-            
-            return {
-                'rsi': rsi,
-                'stoch_rsi': stoch_rsi,
-                'ema_8': ema_8,
-                'ema_21': ema_21,
-                'sma_50': sma_50,
-                'macd_histogram': macd_histogram.iloc[-1] if not macd_histogram.empty else 0,
-                'volume_ratio': volume_ratio,
-                'volatility': volatility,
-                'price_change_5m': ((closes[-1] - closes[-2]) / closes[-2]) * 100,
-                'price_change_1h': ((closes[-1] - closes[-12]) / closes[-12]) * 100,
-                'price_change_4h': ((closes[-1] - closes[-48]) / closes[-48]) * 100,
-            }
+            # نفس محرك الدفعات على مصفوفة من صف واحد (views بدون نسخ ولا pandas)
+            matrix = compute_indicator_matrix(
+                np.asarray(data['closes'], dtype=np.float64)[None, :],
+                np.asarray(data['highs'], dtype=np.float64)[None, :],
+                np.asarray(data['lows'], dtype=np.float64)[None, :],
+                np.asarray(data['volumes'], dtype=np.float64)[None, :],
+                interval_ms=INTERVAL_MS[data.get('interval', '5m')]
+            )
+            indicators = {name: float(values[0]) for name, values in matrix.items()}
+            self.metrics.observe('bot_stage_duration_seconds', time.perf_counter() - start, stage='indicators')
+            return indicators
             
         except Exception as e:
+            self.metrics.increment('bot_exceptions_total', stage='indicators', error=type(e).__name__)
             return None
     
-    def generate_trading_signal(self, symbol, data, indicators):
-        """توليد إشارات تداول متقدمة"""
+    def calculate_indicators_batch(self, batch_data):
+        """حساب المؤشرات لمجموعة عملات دفعة واحدة (مصفوفة عملات × شموع)
+        
+        ترجع قائمة (فهارس العملات، قاموس مؤشرات كل قيمة فيه مصفوفة بطول الفهارس).
+        """
+        results = []
+        
+        # تجميع العملات حسب عدد الشموع (والفاصل) حتى تتكوّن مصفوفات منتظمة
+        groups = {}
+        for i, data in enumerate(batch_data):
+            if data and len(data['closes']) >= MIN_CANDLES:
+                groups.setdefault((len(data['closes']), data.get('interval', '5m')), []).append(i)
+        
+        for (_, interval), indices in groups.items():
+            try:
+                with self.metrics.timer('bot_stage_duration_seconds', stage='indicators_batch'):
+                    matrix = compute_indicator_matrix(
+                        np.stack([batch_data[i]['closes'] for i in indices]),
+                        np.stack([batch_data[i]['highs'] for i in indices]),
+                        np.stack([batch_data[i]['lows'] for i in indices]),
+                        np.stack([batch_data[i]['volumes'] for i in indices]),
+                        interval_ms=INTERVAL_MS[interval]
+                    )
+                results.append((indices, matrix))
+            except Exception as e:
+                self.metrics.increment('bot_exceptions_total', stage='indicators', error=type(e).__name__)
+                continue
+        
+        return results
+    
+    def generate_trading_signal(self, symbol, data, indicators, interval='5m'):
+        """توليد إشارات تداول متقدمة (نظام النقاط من جدول القواعد)"""
         try:
             if not indicators:
                 return None
             
-            # نظام نقاط متطور
-            points = 0
-            conditions = []
-            
-            # 1. RSI Conditions (25 نقطة كحد أقصى)
-            if indicators['rsi'] < 25:
-                points += 25
-                conditions.append("RSI شديد التشبع البيعي (<25)")
-            elif indicators['rsi'] < 30:
-                points += 20
-                conditions.append("RSI تشبع بيعي (25-30)")
-            elif indicators['rsi'] < 35:
-                points += 15
-                conditions.append("RSI منخفض (30-35)")
-            
-            # 2. Stochastic RSI (20 نقطة)
-            if indicators['stoch_rsi'] < 20:
-                points += 20
-                conditions.append("Stoch RSI تشبع بيعي (<20)")
-            elif indicators['stoch_rsi'] < 30:
-                points += 15
-                conditions.append("Stoch RSI منخفض (20-30)")
-            
-            # 3. اتجاه المتوسطات (25 نقطة)
-            if indicators['ema_8'] > indicators['ema_21']:
-                points += 15
-                conditions.append("الاتجاه صعودي (EMA8 > EMA21)")
-                if indicators['ema_21'] > indicators['sma_50']:
-                    points += 10
-                    conditions.append("اتجاه قوي (EMA21 > SMA50)")
-            
-            # 4. MACD (15 نقطة)
-            if indicators['macd_histogram'] > 0:
-                points += 10
-                conditions.append("MACD إيجابي")
-                if indicators['macd_histogram'] > indicators['macd_histogram'] * 0.8:  # تحسن
-                    points += 5
-                    conditions.append("MACD متحسن")
-            
-            # 5. الحجم (20 نقطة)
-            if indicators['volume_ratio'] > 3.0:
-                points += 20
-                conditions.append("حجم تداول عالي جداً (3x+)")
-            elif indicators['volume_ratio'] > 2.0:
-                points += 15
-                conditions.append("حجم تداول عالي (2x+)")
-            elif indicators['volume_ratio'] > 1.5:
-                points += 10
-                conditions.append("حجم تداول جيد (1.5x+)")
-            
-            # 6. الزخم (15 نقطة)
-            if indicators['price_change_5m'] > 1.0:
-                points += 10
-                conditions.append("زخم 5 دقائق قوي")
-            elif indicators['price_change_5m'] > 0:
-                points += 5
-                conditions.append("زخم 5 دقائق إيجابي")
-            
-            if indicators['price_change_1h'] > 2.0:
-                points += 5
-                conditions.append("اتجاه ساعة صعودي")
-            
-            # 7. التقلب (10 نقطة)
-            if 2 < indicators['volatility'] < 10:  # تقلب معتدل
-                points += 10
-                conditions.append("تقلب مناسب للتداول")
-            
-            # تحديد قوة الإشارة
-            if points >= 65:  # تخفيض الحد الأدنى لإظهار المزيد من الإشارات
-                if points >= 85:
-                    signal_type = "🟢 شراء قوي"
-                    alert_level = "HIGH"
-                elif points >= 75:
-                    signal_type = "🟡 شراء متوسط"
-                    alert_level = "MEDIUM"
-                else:
-                    signal_type = "🔵 شراء ضعيف"
-                    alert_level = "LOW"
+            with self.metrics.timer('bot_stage_duration_seconds', stage='scoring'):
+                points, masks = self.scoring_rules.evaluate(indicators)
+                if points < self.scoring_rules.min_points:
+                    return None
                 
-                signal_data = {
-                    'symbol': symbol,
-                    'signal': signal_type,
-                    'alert_level': alert_level,
-                    'confidence': points,
-                    'price': data['current_price'],
-                    'rsi': round(indicators['rsi'], 1),
-                    'stoch_rsi': round(indicators['stoch_rsi'], 1),
-                    'volume_ratio': round(indicators['volume_ratio'], 1),
-                    'price_change_5m': round(indicators['price_change_5m'], 2),
-                    'price_change_1h': round(indicators['price_change_1h'], 2),
-                    'conditions': conditions,
-                    'timestamp': datetime.now(),
-                    'analysis_id': self.analysis_count
-                }
-                
-                return signal_data
-            
-            return None
+                return self.build_signal(symbol, data['current_price'], indicators, int(points),
+                                         self.scoring_rules.conditions(masks), interval)
             
         except Exception as e:
+            self.metrics.increment('bot_exceptions_total', stage='scoring', error=type(e).__name__)
             return None
     
-    def analyze_symbols_batch(self, symbols_batch):
+    def score_signals_batch(self, symbols, batch_data, indices, matrix, interval='5m'):
+        """تقييم مجموعة عملات دفعة واحدة؛ الشروط تُبنى فقط للعملات التي تجاوزت الحد"""
+        start = time.perf_counter()
+        points, masks = self.scoring_rules.evaluate(matrix)
+        signals = []
+        
+        # آخر نقاط وتقلب لكل عملة (لأولوية الجدولة)
+        for row, i in enumerate(indices):
+            self.last_scores[symbols[i]] = float(points[row])
+            self.last_volatility[symbols[i]] = float(matrix['volatility'][row])
+            self.last_seen[symbols[i]] = self.analysis_count
+        
+        for row in np.flatnonzero(points >= self.scoring_rules.min_points):
+            i = indices[row]
+            indicators = {name: float(values[row]) for name, values in matrix.items()}
+            signals.append(self.build_signal(
+                symbols[i], batch_data[i]['current_price'], indicators, int(points[row]),
+                self.scoring_rules.conditions(masks, row), interval
+            ))
+        
+        self.metrics.observe('bot_stage_duration_seconds', time.perf_counter() - start, stage='scoring_batch')
+        return signals
+    
+    def build_signal(self, symbol, price, indicators, points, conditions, interval='5m'):
+        """بيانات الإشارة حسب مستوى النقاط"""
+        signal_type, alert_level = self.scoring_rules.classify(points)
+        return {
+            'symbol': symbol,
+            'interval': interval,
+            'signal': signal_type,
+            'alert_level': alert_level,
+            'confidence': points,
+            'price': price,
+            'rsi': round(indicators['rsi'], 1),
+            'stoch_rsi': round(indicators['stoch_rsi'], 1),
+            'volume_ratio': round(indicators['volume_ratio'], 1),
+            'price_change_5m': round(indicators['price_change_5m'], 2),
+            'price_change_1h': round(indicators['price_change_1h'], 2),
+            'conditions': conditions,
+            'timestamp': datetime.now(),
+            'analysis_id': self.analysis_count
+        }
+    
+    def analyze_symbols_batch(self, symbols_batch, interval='5m', closed_only=False):
         """تحليل مجموعة من العملات"""
         signals = []
         
-        for symbol in symbols_batch:
+        # جلب البيانات بالتوازي (المحدد يتكفل بتجنب حظر API)
+        batch_data = self.client.map(
+            lambda s: self.get_klines_data(s, interval, closed_only=closed_only), symbols_batch
+        )
+        
+        # حساب المؤشرات والنقاط لكل المجموعة في تمريرة واحدة
+        for indices, matrix in self.calculate_indicators_batch(batch_data):
             try:
-                # جلب البيانات
-                data = self.get_klines_data(symbol, '5m')
-                if not data:
-                    continue
-                
-                # حساب المؤشرات
-                indicators = self.calculate_advanced_indicators(data)
-                if not indicators:
-                    continue
-                
-                # توليد الإشارة
-                signal = self.generate_trading_signal(symbol, data, indicators)
-                if signal:
-                    signals.append(signal)
-                
-                # إبطاء قليلاً لتجنب حظر API
-                time.sleep(0.1)
-                
+                if self.timeframes:
+                    matrix.update(self.timeframe_matrix(
+                        [symbols_batch[i] for i in indices], [batch_data[i]['candles'] for i in indices],
+                        interval, matrix
+                    ))
+                signals.extend(self.score_signals_batch(symbols_batch, batch_data, indices, matrix, interval))
             except Exception as e:
+                self.metrics.increment('bot_exceptions_total', stage='scoring', error=type(e).__name__)
                 continue
         
         return signals
     
-    def run_analysis_cycle(self):
-        """تشغيل دورة تحليل كاملة"""
+    def run_analysis_cycle(self, symbols=None, deadline=None, closed_only=False, hot=False, intervals=None):
+        """تشغيل دورة تحليل كاملة
+        
+        symbols: عملات محددة (افتراضياً كل عملات الدورة مرتبة حسب الأولوية).
+        intervals: الفواصل المطلوبة (افتراضياً self.intervals).
+        deadline: وقت (time.time) يجب أن تنتهي قبله الدورة؛ ما لا يتسع له يُؤجل.
+        hot: فحص سريع بين الإغلاقات (لا تتكرر إشارة العملة حتى الفحص الكامل التالي).
+        """
         self.analysis_count += 1
         self.stats['total_analyses'] += 1
+        cycle_start = time.perf_counter()
         
-        print(f"\n🔄 دورة التحليل #{self.analysis_count} - {datetime.now().strftime('%H:%M:%S')}")
+        kind = "فحص سريع" if hot else "دورة التحليل"
+        print(f"\n🔄 {kind} #{self.analysis_count} - {datetime.now().strftime('%H:%M:%S')}")
         print("=" * 70)
         
-        # تقسيم العملات إلى مجموعات للمعالجة المتوازية
-        batch_size = 10
-        all_signals = []
+        screening = symbols is None and self.prefilter is not None
+        if symbols is None:
+            symbols = self.cycle_symbols()
+            if screening:
+                symbols = self.screen_symbols(symbols)
+            symbols = self.prioritized_symbols(symbols)
+        with self.profiler.cycle():
+            all_signals, skipped = self.analyze_cycle_symbols(symbols, intervals, deadline, closed_only)
         
-        for i in range(0, len(self.active_symbols), batch_size):
-            batch = self.active_symbols[i:i + batch_size]
-            print(f"📊 تحليل مجموعة {i//batch_size + 1}: {len(batch)} عملة")
-            
-            batch_signals = self.analyze_symbols_batch(batch)
-            all_signals.extend(batch_signals)
-            
-            # عرض التقدم
-            progress = min(100, int((i + batch_size) / len(self.active_symbols) * 100))
-            print(f"📈 التقدم: {progress}%")
+        self.record_cycle_metrics(time.perf_counter() - cycle_start, len(symbols), skipped, deadline)
+        if screening:
+            self.metrics.set_gauge('bot_screen_symbols', len(all_signals), tier='signals')
+            print(f"🔬 المرحلة 2: تحليل {len(symbols)} مرشح ← {len(all_signals)} إشارة")
+        
+        if hot:
+            all_signals = [s for s in all_signals if s['symbol'] not in self._hot_signaled]
+            self._hot_signaled.update(s['symbol'] for s in all_signals)
+        else:
+            self._hot_signaled.clear()
         
         # معالجة النتائج
         if all_signals:
             # ترتيب الإشارات حسب الثقة
             all_signals.sort(key=lambda x: x['confidence'], reverse=True)
-            
-            # تحديث الإحصائيات
-            self.stats['total_signals'] += len(all_signals)
-            strong_count = len([s for s in all_signals if s['confidence'] >= 80])
-            self.stats['strong_signals'] += strong_count
-            self.stats['last_signal_time'] = datetime.now()
-            
-            # حفظ في السجل
-            for signal in all_signals:
-                self.signals_history.append(signal)
-            
+            self.record_signals(all_signals)
             return all_signals
         else:
             return []
     
+    def analyze_cycle_symbols(self, symbols, intervals=None, deadline=None, closed_only=False):
+        """تحليل عملات الدورة على جميع الفواصل (عبر عمليات التوزيع أو محلياً مع طباعة التقدم)
+        
+        ترجع (الإشارات، عدد أزواج العملة/الفاصل التي أُجلت لانتهاء المهلة).
+        """
+        intervals = self.intervals if intervals is None else intervals
+        all_signals = []
+        skipped = 0
+        
+        if self.shard_pool:
+            # توزيع العملات على العمليات ثم دمج الإشارات
+            timeout = self.analysis_interval * 60
+            if deadline is not None:
+                timeout = max(1.0, deadline - time.time())
+            all_signals, per_worker, scores, errors = self.shard_pool.run_cycle(
+                symbols, intervals, self.analysis_count, timeout=timeout, closed_only=closed_only
+            )
+            for index, (error, message) in errors.items():
+                self.metrics.increment('bot_exceptions_total', stage='shard_worker', error=error)
+                print(f"❌ فشلت دورة العامل {index}: {error}: {message}")
+            for symbol, (score, volatility) in scores.items():
+                self.last_scores[symbol] = score
+                self.last_volatility[symbol] = volatility
+                self.last_seen[symbol] = self.analysis_count
+            counts = ', '.join(str(per_worker.get(i, '-')) for i in range(self.shard_pool.workers))
+            print(f"📊 {len(symbols)} عملة × {len(intervals)} فاصل على {self.shard_pool.workers} عملية: [{counts}]")
+            skipped = (len(symbols) - sum(per_worker.values())) * len(intervals)
+        else:
+            # تقسيم العملات إلى مجموعات بحجم مجمع الجلب للمعالجة المتوازية
+            batch_size = self.client.max_workers
+            batch_time = 0.0
+            for interval in intervals:
+                for i in range(0, len(symbols), batch_size):
+                    # تأجيل بقية العملات (الأقل أولوية) إذا لم يعد الوقت يكفي لمجموعة أخرى
+                    if deadline is not None and time.time() + batch_time > deadline:
+                        skipped += len(symbols) - i
+                        break
+                    
+                    batch = symbols[i:i + batch_size]
+                    print(f"📊 تحليل مجموعة {i//batch_size + 1} ({interval}): {len(batch)} عملة")
+                    
+                    batch_start = time.perf_counter()
+                    batch_signals = self.analyze_symbols_batch(batch, interval, closed_only)
+                    all_signals.extend(batch_signals)
+                    batch_time = time.perf_counter() - batch_start
+                    
+                    # عرض التقدم
+                    progress = min(100, int((i + batch_size) / len(symbols) * 100))
+                    print(f"📈 التقدم: {progress}%")
+        
+        return all_signals, skipped
+    
+    def record_cycle_metrics(self, duration, symbol_count, skipped=0, deadline=None):
+        """مدة الدورة مقارنة بفاصل التحليل، والمهل الفائتة"""
+        interval = self.analysis_interval * 60
+        self.metrics.observe('bot_cycle_duration_seconds', duration)
+        self.metrics.set_gauge('bot_last_cycle_duration_seconds', round(duration, 6))
+        self.metrics.set_gauge('bot_cycle_interval_seconds', interval)
+        self.metrics.set_gauge('bot_cycle_symbols', symbol_count)
+        self.metrics.increment('bot_cycles_total')
+        if duration > interval:
+            self.metrics.increment('bot_cycle_overruns_total')
+            print(f"⚠️ مدة الدورة {duration:.1f}s تجاوزت فاصل التحليل ({interval}s)")
+        
+        if deadline is not None and (skipped or time.time() > deadline):
+            self.stats['deadline_misses'] += 1
+            self.stats['skipped_symbols'] += skipped
+            self.metrics.increment('bot_deadline_misses_total')
+            self.metrics.increment('bot_skipped_symbols_total', skipped)
+            print(f"⏱️ فاتت مهلة الدورة: أُجلت {skipped} عملة (الأقل أولوية) إلى الدورة التالية")
+    
+    def screen_symbols(self, symbols):
+        """المرحلة 1: فلتر ticker/24hr (طلب واحد) على كل عملات الدورة وإرجاع المرشحين
+        
+        عند تعذر جلب ticker تُستخدم العملات النشطة من هذه الدورة بدلاً من ذلك.
+        """
+        try:
+            with self.metrics.timer('bot_stage_duration_seconds', stage='screen'):
+                tickers = self.client.get('/api/v3/ticker/24hr', weight=TICKER_24HR_ALL_WEIGHT)
+                candidates, counts = self.prefilter.screen(tickers, symbols)
+        except Exception as e:
+            self.metrics.increment('bot_exceptions_total', stage='screen', error=type(e).__name__)
+            active = set(self.active_symbols)
+            candidates = [s for s in symbols if s in active]
+            print(f"⚠️ تعذر الفرز ({e}): تحليل {len(candidates)} عملة نشطة")
+            return candidates
+        
+        for tier, count in counts.items():
+            self.metrics.set_gauge('bot_screen_symbols', count, tier=tier)
+        print(f"🔎 المرحلة 1: {counts['candidates']}/{counts['universe']} عملة مرشحة "
+              f"(سيولة {counts['liquid']}، فرق سعر {counts['tight_spread']}، "
+              f"تغير {counts['moving']}، قفزة حجم {counts['volume_spike']}، اجتازت {counts['passed']})")
+        self.screened = candidates
+        return candidates
+    
+    def prioritized_symbols(self, symbols):
+        """ترتيب العملات حسب الأولوية (القرب من حد الإشارة، التقلب، ومدة الانتظار)"""
+        priority = self.scheduler.priorities(
+            symbols, self.last_scores, self.last_volatility, self.last_seen,
+            self.analysis_count, self.scoring_rules.min_points
+        )
+        return self.scheduler.order(symbols, priority)
+    
+    def hot_symbols(self):
+        """العملات الأعلى أولوية لإعادة فحصها بين إغلاقات الشموع"""
+        symbols = list(self.screened) if self.prefilter else self.cycle_symbols()
+        priority = self.scheduler.priorities(
+            symbols, self.last_scores, self.last_volatility, self.last_seen,
+            self.analysis_count, self.scoring_rules.min_points
+        )
+        return self.scheduler.hot_symbols(symbols, priority)
+    
+    def cycle_symbols(self):
+        """عملات هذه الدورة (النشطة أو كل السوق) بعد تطبيق جزء هذه النسخة"""
+        # نسخة ثابتة (قد يتم تحديث العملات في الخلفية أثناء الدورة)
+        full_market = self.scan_universe or self.prefilter is not None
+        symbols = list(self.all_symbols if full_market else self.active_symbols)
+        if self.shard_count > 1:
+            symbols = [s for s in symbols if shard_of(s, self.shard_count) == self.shard_index]
+        return symbols
+    
+    def analyze_symbols(self, symbols, intervals, closed_only=False):
+        """تحليل قائمة عملات على عدة فواصل زمنية (بدون طباعة التقدم)"""
+        batch_size = self.client.max_workers
+        signals = []
+        for interval in intervals:
+            for i in range(0, len(symbols), batch_size):
+                signals.extend(self.analyze_symbols_batch(symbols[i:i + batch_size], interval, closed_only))
+        return signals
+    
+    def start_shard_pool(self, workers):
+        """تشغيل عمليات التوزيع (كل عملية بنسخة بوت مستقلة وميزانية وزن جزئية)"""
+        options = dict(self.bot_options, intervals=self.intervals, timeframes=self.timeframes)
+        self.shard_pool = ShardWorkerPool(workers, options, self.client.rate_limiter.max_weight)
+    
+    def stop_shard_pool(self):
+        if self.shard_pool:
+            self.shard_pool.close()
+            self.shard_pool = None
+    
+    def start_metrics_server(self, port):
+        """عرض القياسات بصيغة Prometheus على /metrics (والتحكم بالتحليل الزمني على /profile)"""
+        self.metrics_server = MetricsServer(self.metrics, self.profiler, port).start()
+        print(f"📈 القياسات: http://127.0.0.1:{self.metrics_server.port}/metrics")
+    
+    def stop_metrics_server(self):
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+    
+    def save_profile(self):
+        """إيقاف التحليل الزمني (إن كان يعمل) وحفظ تقريره في ملف"""
+        if not self.profiler.mode:
+            return None
+        path = f"profile-{self.profiler.mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
+        with open(path, 'w') as f:
+            f.write(self.profiler.stop())
+        print(f"🧪 تقرير التحليل الزمني: {path}")
+        return path
+    
+    def shutdown(self):
+        """إيقاف خيوط وعمليات الخلفية"""
+        self.stop_symbol_refresh()
+        self.stop_shard_pool()
+        self.save_profile()
+        self.stop_metrics_server()
+        if self.signal_store:
+            self.signal_store.close()
+            self.signal_store = None
+    
+    def record_signals(self, signals):
+        """تحديث الإحصائيات وحفظ الإشارات في السجل"""
+        self.stats['total_signals'] += len(signals)
+        strong_count = len([s for s in signals if s['confidence'] >= 80])
+        self.stats['strong_signals'] += strong_count
+        self.stats['last_signal_time'] = datetime.now()
+        
+        for signal in signals:
+            self.signals_history.append(signal)
+            self.metrics.increment('bot_signals_total', alert_level=signal['alert_level'])
+        
+        # الكتابة على القرص في الخلفية (لا تؤخر الدورة)
+        if self.signal_store:
+            self.signal_store.add(signals)
+    
+    def run_scheduled(self):
+        """حلقة التحليل: فحص كامل بعد إغلاق كل شمعة، وفحص سريع للعملات الساخنة بينها"""
+        scheduler = self.scheduler
+        next_full = scheduler.next_full_scan()
+        next_hot = time.time() + scheduler.recheck if scheduler.recheck else float('inf')
+        
+        while True:
+            now = time.time()
+            if now >= next_full:
+                # الشمعة أُغلقت: فحص كل العملات على الشموع المغلقة بترتيب الأولوية
+                intervals = scheduler.closing_intervals(self.intervals, next_full - scheduler.settle)
+                signals = self.run_analysis_cycle(deadline=scheduler.full_scan_deadline(now),
+                                                  closed_only=True, intervals=intervals)
+                print_cycle_result(signals)
+                self.print_detailed_stats()
+                next_full = scheduler.next_full_scan()
+                if scheduler.recheck:
+                    next_hot = time.time() + scheduler.recheck
+            
+            elif now >= next_hot:
+                # بين الإغلاقات: إعادة فحص العملات القريبة من الإشارة فقط
+                hot = self.hot_symbols()
+                if hot:
+                    deadline = min(scheduler.hot_scan_deadline(now), next_full)
+                    signals = self.run_analysis_cycle(hot, deadline=deadline, hot=True,
+                                                      intervals=[scheduler.interval])
+                    if signals:
+                        print_signals(signals)
+                next_hot = now + scheduler.recheck
+            
+            else:
+                # عرض العد التنازلي
+                remaining = next_full - now
+                print(f"\r⏳ إغلاق الشمعة القادمة خلال: {int(remaining // 60):02d}:{int(remaining % 60):02d}",
+                      end='', flush=True)
+                time.sleep(min(next_full, next_hot, now + 10) - now)
+    
+    def get_indicator_state(self, symbol, open_time):
+        """حالة المؤشرات التزايدية للعملة (تُهيأ من الشموع المحفوظة الأقدم من open_time)"""
+        state = self.indicator_states.get(symbol)
+        if state is None:
+            candles = self.candle_cache.get(symbol, self.stream_interval).view(self.kline_lookback)
+            closed = candles[:, candles[OPEN_TIME] < open_time]  # بدون الشمعة الحالية
+            state = IncrementalIndicators.from_candles(closed[HIGH], closed[LOW], closed[CLOSE], closed[VOLUME])
+            self.indicator_states[symbol] = state
+        return state
+    
+    def handle_stream_kline(self, symbol, kline):
+        """معالجة تحديث شمعة من البث: تحديث المخزن والمؤشرات وتقييم العملة"""
+        high, low, close, volume = float(kline['h']), float(kline['l']), float(kline['c']), float(kline['v'])
+        row = np.array([[kline['t'], kline['o'], high, low, close, volume]], dtype=np.float64)
+        buffer = self.candle_cache.get(symbol, self.stream_interval)
+        last = buffer.last_open_time()
+        if last is not None and kline['t'] < last:
+            return  # رسالة متأخرة: سد الفجوة عبر REST جلب هذه الشمعة وما بعدها
+        buffer.update(row)
+        
+        if kline['x']:
+            # شمعة مغلقة: تحديث بزمن ثابت
+            state = self.get_indicator_state(symbol, kline['t'])
+            state.update(high, low, close, volume)
+            if self._tick_signaled.pop(symbol, None) == kline['t']:
+                return  # صدرت إشارتها أثناء التكوين
+            indicators = state.snapshot()
+        elif self.evaluate_on_tick and self._tick_signaled.get(symbol) != kline['t']:
+            # الشمعة قيد التكوين: قيم مؤقتة بدون تعديل الحالة
+            indicators = self.get_indicator_state(symbol, kline['t']).provisional(high, low, close, volume)
+        else:
+            return
+        
+        if self.timeframes and indicators:
+            candles = self.candle_cache.get(symbol, self.stream_interval).view()
+            single = {name: np.array([value]) for name, value in indicators.items()}
+            for name, values in self.timeframe_matrix([symbol], [candles], self.stream_interval, single).items():
+                indicators[name] = float(values[0])
+        
+        data = {'current_price': close}
+        signal = self.generate_trading_signal(symbol, data, indicators, self.stream_interval)
+        if signal:
+            if not kline['x']:
+                self._tick_signaled[symbol] = kline['t']
+            self.record_signals([signal])
+            print_signals([signal])
+    
+    def backfill_symbols(self, symbols):
+        """سد فجوة الشموع عبر REST (بعد بدء البث أو إعادة الاتصال)"""
+        self.client.map(lambda s: self.get_klines_data(s, self.stream_interval), symbols)
+        
+        # الحالة التزايدية فاتتها شموع: تُعاد تهيئتها من المخزن عند أول استخدام
+        for symbol in symbols:
+            self.indicator_states.pop(symbol, None)
+    
+    def run_stream(self):
+        """وضع البث: تقييم كل عملة فور إغلاق شمعتها"""
+        symbols = self.cycle_symbols()
+        print(f"📡 تحميل الشموع الأولية لـ {len(symbols)} عملة...")
+        self.backfill_symbols(symbols)
+        
+        self.streamer = KlineStreamer(
+            symbols, self.stream_interval,
+            on_kline=self.handle_stream_kline,
+            on_connect=self.backfill_symbols,
+            url=self.ws_url
+        )
+        print(f"📡 البث مباشر: {len(symbols)} عملة على {self.stream_interval}")
+        asyncio.run(self.streamer.run())
+    
     def print_detailed_stats(self):
         """طباعة إحصائيات مفصلة"""
         print(f"\n📊 إحصائيات البوت:")
         print(f"   • إجمالي دورات التحليل: {self.stats['total_analyses']}")
         print(f"   • إجمالي الإشارات المكتشفة: {self.stats['total_signals']}")
         print(f"   • الإشارات القوية: {self.stats['strong_signals']}")
+        print(f"   • وزن API المستخدم (آخر دقيقة): {self.metrics.value('exchange_used_weight_1m')}")
+        if self.metrics.value('bot_cycle_overruns_total'):
+            print(f"   • دورات تجاوزت الفاصل: {self.metrics.value('bot_cycle_overruns_total')}")
         
         if self.stats['last_signal_time']:
             time_since = datetime.now() - self.stats['last_signal_time']
             minutes = int(time_since.total_seconds() / 60)
             print(f"   • آخر إشارة منذ: {minutes} دقيقة")
         
-        # عرض آخر 5 إشارات
-        recent_signals = list(self.signals_history)[-5:]
+        if self.stats['deadline_misses']:
+            print(f"   • مهل فائتة: {self.stats['deadline_misses']} (عملات مؤجلة: {self.stats['skipped_symbols']})")
+        
+        # عرض آخر 5 إشارات (بدون نسخ السجل كاملاً)
+        recent_signals = list(islice(reversed(self.signals_history), 5))[::-1]
         if recent_signals:
             print(f"\n📈 آخر الإشارات:")
             for signal in recent_signals:
                 time_str = signal['timestamp'].strftime('%H:%M')
                 print(f"   • {signal['symbol']} - {signal['signal']} ({signal['confidence']}%) - {time_str}")
 
+def print_signals(signals):
+    """عرض الإشارات المكتشفة"""
+    for i, signal in enumerate(signals[:10], 1):  # عرض أول 10 إشارات
+        print(f"\n{i}. {signal['symbol']} ({signal['interval']}) - {signal['signal']}")
+        print(f"   الثقة: {signal['confidence']}% | السعر: ${signal['price']:.4f}")
+        print(f"   RSI: {signal['rsi']} | Stoch RSI: {signal['stoch_rsi']}")
+        print(f"   الحجم: {signal['volume_ratio']}x | التغير (5m): {signal['price_change_5m']}%")
+        print(f"   الشروط: {', '.join(signal['conditions'][:3])}")
+    
+    if len(signals) > 10:
+        print(f"\n   ... و{len(signals) - 10} إشارة إضافية")
+
+def print_cycle_result(signals):
+    """عرض نتيجة دورة التحليل"""
+    if signals:
+        print(f"\n🎯 تم اكتشاف {len(signals)} إشارة تداول!")
+        print("=" * 70)
+        print_signals(signals)
+    else:
+        print("\n⚠️ لم يتم اكتشاف أي إشارات قوية في هذه الدورة.")
+        print("💡 هذا طبيعي - البوت ينتظر الظروف المثلى للتداول")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Advanced crypto trading bot")
+    parser.add_argument('--stream', action='store_true',
+                        help="event-driven mode: evaluate each symbol when its candle closes (WebSocket)")
+    parser.add_argument('--tick', action='store_true',
+                        help="with --stream, also evaluate still-forming candles on every update")
+    parser.add_argument('--universe', choices=['active', 'all', 'screen'], default='active',
+                        help="analyse the most active pairs, every USDT pair, or every pair that passes "
+                             "a bulk 24h-ticker prefilter (screen)")
+    parser.add_argument('--min-change', type=float, default=2.0,
+                        help="screen: minimum absolute 24h price change (%%)")
+    parser.add_argument('--min-volume-spike', type=float, default=2.0,
+                        help="screen: minimum volume since the previous snapshot vs its 24h average rate")
+    parser.add_argument('--max-spread', type=float, default=0.15, help="screen: maximum bid/ask spread (%%)")
+    parser.add_argument('--min-quote-volume', type=float, default=1_000_000,
+                        help="screen: minimum 24h quote volume (USDT)")
+    parser.add_argument('--max-candidates', type=int, default=50,
+                        help="screen: cap on symbols passed to the full kline analysis per cycle")
+    parser.add_argument('--intervals', nargs='+', default=['5m'], choices=list(INTERVAL_MS),
+                        help="kline intervals to analyse (full scans run when each interval's candle closes)")
+    parser.add_argument('--recheck', type=float, default=60,
+                        help="seconds between rechecks of near-threshold symbols between candle closes (0 disables)")
+    parser.add_argument('--hot-count', type=int, default=20, help="symbols rechecked between candle closes")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes, each owning a shard of symbols")
+    parser.add_argument('--shard-index', type=int, default=0, help="this instance's shard (multi-instance)")
+    parser.add_argument('--shard-count', type=int, default=1, help="total instances sharing the universe")
+    parser.add_argument('--data-dir', help="on-disk kline store: warm start from disk and keep history")
+    parser.add_argument('--timeframes', nargs='+', choices=list(INTERVAL_MS),
+                        help="higher timeframes resampled from cached candles (default: those used by the rules)")
+    parser.add_argument('--signals-db', help="SQLite file that keeps every signal across restarts")
+    parser.add_argument('--rules', default=DEFAULT_RULES_PATH, help="scoring rule table (JSON or YAML)")
+    parser.add_argument('--base-url', default=BINANCE_API_URL, help="REST API base URL")
+    parser.add_argument('--ws-url', default=BINANCE_WS_URL, help="WebSocket base URL")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve Prometheus metrics on /metrics and the profiler toggle on /profile")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'],
+                        help="start profiling immediately (stop via /profile/stop or Ctrl+C)")
+    return parser.parse_args()
+
 # تشغيل البوت
 def main():
-    bot = AdvancedTradingBot()
+    args = parse_args()
+    
+    print("🚀 ADVANCED CRYPTO TRADING BOT - ULTIMATE VERSION")
+    print("📊 Real-time Analysis - All Cryptocurrencies")
+    print("🎯 High Frequency Signals - Tested & Proven")
+    print("=" * 70)
+    
+    bot = AdvancedTradingBot(base_url=args.base_url, ws_url=args.ws_url, data_dir=args.data_dir,
+                             rules_path=args.rules, signals_db=args.signals_db)
+    bot.evaluate_on_tick = args.tick
+    bot.scan_universe = args.universe == 'all'
+    if args.universe == 'screen':
+        bot.prefilter = TickerPrefilter(args.min_change, args.min_volume_spike, args.max_spread,
+                                        args.min_quote_volume, args.max_candidates)
+    bot.intervals = args.intervals
+    bot.scheduler = CandleScheduler(min(args.intervals, key=INTERVAL_MS.get), recheck=args.recheck,
+                                    hot_count=args.hot_count)
+    bot.analysis_interval = bot.scheduler.period / 60
+    bot.set_timeframes(args.timeframes or [])
+    bot.shard_index, bot.shard_count = args.shard_index, args.shard_count
+    if args.workers > 1 and not args.stream:
+        bot.start_shard_pool(args.workers)
+    if args.metrics_port is not None:
+        bot.start_metrics_server(args.metrics_port)
+    if args.profile:
+        bot.profiler.start(args.profile)
+    bot.start_symbol_refresh()
+    
+    if args.stream:
+        try:
+            bot.run_stream()
+        except KeyboardInterrupt:
+            print(f"\n\n🛑 تم إيقاف البوت بواسطة المستخدم")
+            bot.print_detailed_stats()
+        finally:
+            bot.shutdown()
+        return
     
     print("\n" + "="*70)
     print("🎯 البوت جاهز للعمل! سيبدأ التحليل تلقائياً...")
-    print("⏰ فاصل التحليل: 2 دقيقة | عدد العملات: 50 عملة نشطة")
+    print(f"⏰ فحص كامل عند إغلاق كل شمعة {bot.scheduler.interval} | "
+          f"فحص سريع لأعلى {bot.scheduler.hot_count} عملة كل {bot.scheduler.recheck:g} ث")
     print("="*70)
     
-    last_analysis = datetime.now()
-    
     try:
-        while True:
-            current_time = datetime.now()
-            time_since_last = (current_time - last_analysis).total_seconds() / 60
-            
-            # التحقق إذا حان وقت التحليل
-            if time_since_last >= bot.analysis_interval:
-                # تشغيل التحليل
-                signals = bot.run_analysis_cycle()
-                
-                # عرض النتائج
-                if signals:
-                    print(f"\n🎯 تم اكتشاف {len(signals)} إشارة تداول!")
-                    print("=" * 70)
-                    
-                    for i, signal in enumerate(signals[:10], 1):  # عرض أول 10 إشارات
-                        print(f"\n{i}. {signal['symbol']} - {signal['signal']}")
-                        print(f"   الثقة: {signal['confidence']}% | السعر: ${signal['price']:.4f}")
-                        print(f"   RSI: {signal['rsi']} | Stoch RSI: {signal['stoch_rsi']}")
-                        print(f"   الحجم: {signal['volume_ratio']}x | التغير (5m): {signal['price_change_5m']}%")
-                        print(f"   الشروط: {', '.join(signal['conditions'][:3])}")
-                    
-                    if len(signals) > 10:
-                        print(f"\n   ... و{len(signals) - 10} إشارة إضافية")
-                else:
-                    print("\n⚠️ لم يتم اكتشاف أي إشارات قوية في هذه الدورة.")
-                    print("💡 هذا طبيعي - البوت ينتظر الظروف المثلى للتداول")
-                
-                # تحديث وقت آخر تحليل
-                last_analysis = datetime.now()
-                
-                # عرض الإحصائيات
-                bot.print_detailed_stats()
-            
-            else:
-                # عرض العد التنازلي
-                remaining = bot.analysis_interval - time_since_last
-                minutes = int(remaining)
-                seconds = int((remaining - minutes) * 60)
-                print(f"\r⏳ التحليل القادم خلال: {minutes:02d}:{seconds:02d}", end='', flush=True)
-            
-            # الانتظار لدقيقة قبل الفحص التالي
-            time.sleep(10)
-            
+        bot.run_scheduled()
     except KeyboardInterrupt:
         print(f"\n\n🛑 تم إيقاف البوت بواسطة المستخدم")
         print("📊 الإحصائيات النهائية:")
         bot.print_detailed_stats()
         print("\n🎯 شكراً لاستخدامك البوت المتقدم!")
+    finally:
+        bot.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,223 @@
+"""اختبار تاريخي سريع لنظام نقاط generate_trading_signal
+
+يقرأ شموعاً محفوظة (بدون شبكة) ويحسب المؤشرات والنقاط لكل شمعة دفعة
+واحدة، ثم العوائد المستقبلية ونسبة النجاح لكل مستوى تنبيه.
+
+    python kline_store.py --data-dir data --days 730 --symbols BTCUSDT ETHUSDT
+    python backtest.py --data-dir data --workers 8
+    python backtest.py --data-dir data --low 60 65 70 --medium 75 80 --high 85 90
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from exchange_client import INTERVAL_MS, OPEN_TIME, HIGH, LOW, CLOSE, VOLUME
+from indicators import indicator_series, MIN_CANDLES
+from kline_store import KlineStore
+from scoring_rules import ScoringRules, DEFAULT_RULES_PATH
+from timeframes import TIMEFRAME_INDICATORS, parse_timeframe, timeframe_series
+
+ALERT_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+DEFAULT_HORIZONS = (1, 3, 12, 48)
+
+
+def forward_returns(closes, horizons):
+    """العائد بالنسبة المئوية بعد كل أفق زمني (NaN في نهاية السلسلة)"""
+    returns = np.full((len(horizons), len(closes)), np.nan)
+    for row, horizon in enumerate(horizons):
+        returns[row, :-horizon] = (closes[horizon:] - closes[:-horizon]) / closes[:-horizon] * 100
+    return returns
+
+
+def add_timeframe_series(indicators, candles, rules, interval):
+    """إضافة مؤشرات الفواصل الأعلى التي تستخدمها القواعد (rsi_1h ...) كما يحسبها البوت"""
+    timeframes = {parsed[1] for parsed in map(parse_timeframe, rules.indicator_names()) if parsed}
+    base_ms = INTERVAL_MS[interval]
+    for timeframe in timeframes:
+        if timeframe == interval:
+            indicators.update({f"{name}_{timeframe}": indicators[name] for name in TIMEFRAME_INDICATORS})
+        elif INTERVAL_MS[timeframe] > base_ms and INTERVAL_MS[timeframe] % base_ms == 0:
+            indicators.update(timeframe_series(candles, interval, timeframe))
+        else:
+            # مثل البوت: فاصل أصغر أو غير مضاعف غير متاح
+            length = len(candles[OPEN_TIME])
+            indicators.update({f"{name}_{timeframe}": np.full(length, np.nan) for name in TIMEFRAME_INDICATORS})
+    return indicators
+
+
+def backtest_symbol(data_dir, symbol, interval, horizons, min_score, rules_path=DEFAULT_RULES_PATH):
+    """نقاط (من جدول القواعد) وعوائد عملة واحدة، مجمّعة كمدرج تكراري حسب النقاط
+
+    المدرج يكفي لتقييم أي حدود تنبيه لاحقاً بدون إعادة الحساب.
+    """
+    rules = ScoringRules.load(rules_path)
+    candles = KlineStore(data_dir).read(symbol, interval)
+    bins = rules.max_points + 1
+    result = {
+        'symbol': symbol,
+        'bars': len(candles[OPEN_TIME]),
+        'count': np.zeros((len(horizons), bins)),
+        'sum': np.zeros((len(horizons), bins)),
+        'hits': np.zeros((len(horizons), bins)),
+        'signals': None,
+    }
+    if result['bars'] <= MIN_CANDLES:
+        return result
+
+    closes = candles[CLOSE]
+    indicators = indicator_series(candles[HIGH], candles[LOW], closes, candles[VOLUME],
+                                  interval_ms=INTERVAL_MS[interval])
+    add_timeframe_series(indicators, candles, rules, interval)
+    scores = rules.score(indicators)
+    scores[:MIN_CANDLES - 1] = -1  # لا إشارات قبل توفر شموع كافية
+    returns = forward_returns(closes, horizons)
+
+    scored = scores >= 0
+    for row in range(len(horizons)):
+        valid = scored & ~np.isnan(returns[row])
+        result['count'][row] = np.bincount(scores[valid], minlength=bins)
+        result['sum'][row] = np.bincount(scores[valid], weights=returns[row][valid], minlength=bins)
+        result['hits'][row] = np.bincount(scores[valid], weights=returns[row][valid] > 0, minlength=bins)
+
+    selected = np.flatnonzero(scores >= min_score)
+    result['signals'] = {
+        'open_time': np.asarray(candles[OPEN_TIME][selected]),
+        'score': scores[selected],
+        'price': np.asarray(closes[selected]),
+        'returns': returns[:, selected],
+    }
+    return result
+
+
+def level_stats(totals, thresholds, horizons):
+    """عدد الإشارات ومتوسط العائد ونسبة النجاح لكل مستوى تنبيه"""
+    bounds = list(thresholds) + [totals['count'].shape[1]]
+    stats = {}
+    for level, low, high in zip(ALERT_LEVELS, bounds[:-1], bounds[1:]):
+        count = totals['count'][:, low:high].sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = totals['sum'][:, low:high].sum(axis=1) / count
+            hit_rate = totals['hits'][:, low:high].sum(axis=1) / count
+        stats[level] = {
+            'signals': int(count[0]),
+            'horizons': {
+                str(horizon): {'mean_return': _finite(mean[row]), 'hit_rate': _finite(hit_rate[row])}
+                for row, horizon in enumerate(horizons)
+            }
+        }
+    return stats
+
+
+def _finite(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def threshold_grid(lows, mediums, highs):
+    """جميع التركيبات الصالحة (LOW < MEDIUM < HIGH)"""
+    return [combo for combo in itertools.product(lows, mediums, highs) if combo[0] < combo[1] < combo[2]]
+
+
+def write_signals(path, results, horizons, thresholds):
+    """حفظ كل الإشارات مع عوائدها المستقبلية في ملف CSV"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'open_time', 'score', 'alert_level', 'price']
+                        + [f"return_{horizon}" for horizon in horizons])
+        for result in results:
+            signals = result['signals']
+            if signals is None:
+                continue
+            levels = np.searchsorted(thresholds, signals['score'], side='right') - 1
+            for i in np.flatnonzero(levels >= 0):
+                open_time = datetime.fromtimestamp(signals['open_time'][i] / 1000, tz=timezone.utc)
+                writer.writerow([result['symbol'], open_time.isoformat(), int(signals['score'][i]),
+                                 ALERT_LEVELS[levels[i]], signals['price'][i]]
+                                + [_finite(value) for value in signals['returns'][:, i]])
+
+
+def run_backtest(data_dir, symbols, interval='5m', horizons=DEFAULT_HORIZONS,
+                 grid=None, workers=None, signals_out=None, rules_path=DEFAULT_RULES_PATH):
+    """تشغيل الاختبار على جميع العملات بالتوازي عبر العمليات، ثم تقييم كل حدود الشبكة"""
+    grid = grid or [ScoringRules.load(rules_path).thresholds()]
+    min_score = min(combo[0] for combo in grid)
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            backtest_symbol,
+            itertools.repeat(data_dir), symbols, itertools.repeat(interval),
+            itertools.repeat(tuple(horizons)), itertools.repeat(min_score), itertools.repeat(rules_path),
+            chunksize=max(1, len(symbols) // (4 * (workers or os.cpu_count() or 1)))
+        ))
+
+    totals = {key: sum(result[key] for result in results) for key in ('count', 'sum', 'hits')}
+    if signals_out:
+        write_signals(signals_out, results, horizons, grid[0])
+
+    return {
+        'symbols': len(symbols),
+        'bars': int(sum(result['bars'] for result in results)),
+        'seconds': round(time.perf_counter() - started, 3),
+        'horizons': list(horizons),
+        'results': [
+            {'thresholds': list(combo), 'levels': level_stats(totals, combo, horizons)}
+            for combo in grid
+        ],
+    }
+
+
+def print_report(report, horizon):
+    print(f"📊 {report['symbols']} عملة | {report['bars']:,} شمعة | {report['seconds']} ث")
+    print(f"{'thresholds':>14} | " + " | ".join(f"{level:^26}" for level in ALERT_LEVELS))
+    for entry in report['results']:
+        cells = []
+        for level in ALERT_LEVELS:
+            stats = entry['levels'][level]
+            values = stats['horizons'][str(horizon)]
+            hit_rate = values['hit_rate'] if values['hit_rate'] is not None else float('nan')
+            mean = values['mean_return'] if values['mean_return'] is not None else float('nan')
+            cells.append(f"{stats['signals']:>8} {hit_rate * 100:>6.1f}% {mean:>+8.3f}%")
+        print(f"{'/'.join(map(str, entry['thresholds'])):>14} | " + " | ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', required=True, help="kline store directory (see kline_store.py)")
+    parser.add_argument('--interval', default='5m')
+    parser.add_argument('--symbols', nargs='+', help="default: every stored symbol")
+    parser.add_argument('--horizons', type=int, nargs='+', default=list(DEFAULT_HORIZONS),
+                        help="forward-return horizons in bars")
+    parser.add_argument('--rules', default=DEFAULT_RULES_PATH, help="scoring rule table (JSON or YAML)")
+    parser.add_argument('--low', type=int, nargs='+', help="LOW thresholds to sweep (default: from rules)")
+    parser.add_argument('--medium', type=int, nargs='+', help="MEDIUM thresholds to sweep")
+    parser.add_argument('--high', type=int, nargs='+', help="HIGH thresholds to sweep")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--signals-out', help="write every signal of the first grid entry to this CSV")
+    parser.add_argument('--report', help="write the full report to this JSON file")
+    args = parser.parse_args()
+
+    symbols = args.symbols or KlineStore(args.data_dir).symbols(args.interval)
+    low, medium, high = ScoringRules.load(args.rules).thresholds()
+    grid = threshold_grid(args.low or [low], args.medium or [medium], args.high or [high])
+    if not grid:
+        parser.error("no threshold combination with low < medium < high")
+
+    report = run_backtest(args.data_dir, symbols, args.interval, args.horizons, grid,
+                          args.workers, args.signals_out, args.rules)
+    print_report(report, args.horizons[0])
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""دقة وسرعة محرك المؤشرات المصفوفي
+
+الدقة تُقاس لكل المؤشرات مقابل مرجع مستقل بحلقات Python بسيطة (Wilder RSI،
+نافذة Stoch RSI صريحة، EMA بتعريف pandas، ومتوسطات عادية)، للمحرك دفعة واحدة
+ولـ calculate_advanced_indicators لكل عملة (التي تستخدم المحرك نفسه بصف واحد).
+
+python benchmarks/bench_indicator_matrix.py --symbols 500 --candles 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_bot import AdvancedTradingBot
+from indicators import compute_indicator_matrix
+
+
+def random_market(n_symbols, n_candles, seed=42):
+    """أسعار عشوائية (random walk) لعدة عملات"""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_symbols, n_candles)), axis=1))
+    spread = np.abs(rng.normal(0, 0.005, (n_symbols, n_candles))) * closes
+    volumes = rng.lognormal(3, 1, (n_symbols, n_candles))
+    return closes, closes + spread, closes - spread, volumes
+
+
+def per_symbol(closes, highs, lows, volumes):
+    bot = AdvancedTradingBot(load_symbols=False)
+    results = []
+    for row in range(len(closes)):
+        data = {
+            'closes': closes[row], 'highs': highs[row], 'lows': lows[row],
+            'volumes': volumes[row], 'current_price': closes[row][-1]
+        }
+        results.append(bot.calculate_advanced_indicators(data))
+    return results
+
+
+def _ema(values, span):
+    """EMA بتعريف pandas ewm(span, adjust=True): متوسط موزون بأوزان decay^k"""
+    decay = 1 - 2 / (span + 1)
+    numerator = denominator = 0.0
+    out = []
+    for value in values:
+        numerator = value + decay * numerator
+        denominator = 1 + decay * denominator
+        out.append(numerator / denominator)
+    return out
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def reference_indicators(closes, highs, lows, volumes, period=14):
+    """مرجع مستقل لعملة واحدة بحلقات Python بسيطة (بدون indicators.py ولا NumPy)"""
+    closes, highs, lows, volumes = (list(map(float, values)) for values in (closes, highs, lows, volumes))
+
+    # RSI (Wilder): بذرة بمتوسط بسيط لأول period فرق ثم avg = (avg*(p-1) + x) / p
+    deltas = [b - a for a, b in zip(closes, closes[1:])]
+    rsi_values = []
+    avg_gain = avg_loss = None
+    for i, delta in enumerate(deltas):
+        if i + 1 < period:
+            continue
+        if avg_gain is None:
+            avg_gain = _mean([max(d, 0.0) for d in deltas[:period]])
+            avg_loss = _mean([max(-d, 0.0) for d in deltas[:period]])
+        else:
+            avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+        if avg_loss == 0:
+            rsi_values.append(100.0 if avg_gain > 0 else 50.0)
+        else:
+            rsi_values.append(100 - 100 / (1 + avg_gain / avg_loss))
+    rsi = rsi_values[-1] if rsi_values else 50.0
+
+    # Stochastic RSI: موقع آخر RSI بين أدنى وأعلى قيمة في آخر period قيمة
+    if len(rsi_values) >= period:
+        window = rsi_values[-period:]
+        low, high = min(window), max(window)
+        stoch_rsi = 50.0 if high == low else (window[-1] - low) / (high - low) * 100
+    else:
+        stoch_rsi = 50.0
+
+    macd = [fast - slow for fast, slow in zip(_ema(closes, 12), _ema(closes, 26))]
+    volume_avg = _mean(volumes[-20:])
+    atr = _mean([high - low for high, low in zip(highs[-14:], lows[-14:])])
+    current = closes[-1]
+
+    return {
+        'rsi': rsi,
+        'stoch_rsi': stoch_rsi,
+        'ema_8': _ema(closes, 8)[-1],
+        'ema_21': _ema(closes, 21)[-1],
+        'sma_50': _mean(closes[-50:]) if len(closes) >= 50 else float('nan'),
+        'macd_histogram': macd[-1] - _ema(macd, 9)[-1],
+        'volume_ratio': volumes[-1] / volume_avg if volume_avg > 0 else 1.0,
+        'volatility': atr / current * 100,
+        'price_change_5m': (current - closes[-2]) / closes[-2] * 100,
+        'price_change_1h': (current - closes[-12]) / closes[-12] * 100,
+        'price_change_4h': (current - closes[-48]) / closes[-48] * 100,
+    }
+
+
+def check_parity(per_symbol_results, matrix, rtol=1e-7, atol=1e-9):
+    """التأكد من تطابق النتائج لكل مؤشر ولكل عملة"""
+    for name, values in matrix.items():
+        expected = np.array([result[name] for result in per_symbol_results], dtype=np.float64)
+        if not np.allclose(values, expected, rtol=rtol, atol=atol, equal_nan=True):
+            worst = np.nanmax(np.abs(values - expected))
+            raise AssertionError(f"{name}: mismatch (max abs diff {worst})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--candles', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    market = random_market(args.symbols, args.candles)
+
+    start = time.perf_counter()
+    reference = [reference_indicators(*row) for row in zip(*market)]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = per_symbol(*market)
+    per_symbol_time = time.perf_counter() - start
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        matrix = compute_indicator_matrix(*market)
+        best = min(best, time.perf_counter() - start)
+
+    check_parity(reference, matrix)
+    check_parity(reference, {name: np.array([result[name] for result in results]) for name in matrix})
+    print(f"parity: OK ({len(matrix)} indicators x {args.symbols} symbols vs reference loops)")
+    print(f"reference:  {reference_time * 1000:.1f} ms "
+          f"({reference_time / args.symbols * 1e6:.0f} us/symbol)")
+    print(f"per-symbol: {per_symbol_time * 1000:.1f} ms "
+          f"({per_symbol_time / args.symbols * 1e6:.0f} us/symbol, calculate_advanced_indicators)")
+    print(f"matrix:     {best * 1000:.2f} ms ({best / args.symbols * 1e6:.1f} us/symbol)")
+    print(f"speedup:    {per_symbol_time / best:.0f}x vs per-symbol calls")
+
+if __name__ == '__main__':
+    main()
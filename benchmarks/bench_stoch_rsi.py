@@ -0,0 +1,67 @@
+"""مقارنة سرعة Stochastic RSI: الحلقة القديمة (RSI لكل نافذة) مقابل سلسلة Wilder + نافذة منزلقة
+
+python benchmarks/bench_stoch_rsi.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import rsi_series, stoch_rsi_series, last_or_default
+
+
+def legacy_stoch_rsi(closes, period=14):
+    """التطبيق السابق: استدعاء calculate_rsi على كل نافذة في حلقة Python"""
+    def calculate_rsi(prices):
+        deltas = np.diff(prices)
+        gains = np.where(deltas > 0, deltas, 0)
+        losses = np.where(deltas < 0, -deltas, 0)
+        avg_gains = np.convolve(gains, np.ones(period) / period, mode='valid')
+        avg_losses = np.convolve(losses, np.ones(period) / period, mode='valid')
+        rs = avg_gains / (avg_losses + 1e-10)
+        rsi = 100 - (100 / (1 + rs))
+        return rsi[-1] if len(rsi) > 0 else 50
+
+    rsi_values = [calculate_rsi(closes[i:i + period]) for i in range(len(closes) - period)]
+    if len(rsi_values) < period:
+        return 50
+    window = rsi_values[-period:]
+    if max(window) == min(window):
+        return 50
+    return (rsi_values[-1] - min(window)) / (max(window) - min(window)) * 100
+
+
+def stoch_rsi(closes, period=14):
+    return float(last_or_default(stoch_rsi_series(rsi_series(closes, period), period)))
+
+
+def best_time(func, closes, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(closes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'candles':>8} {'legacy (ms)':>12} {'series (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+        legacy = best_time(legacy_stoch_rsi, closes, args.repeat)
+        series = best_time(stoch_rsi, closes, args.repeat)
+        print(f"{size:>8} {legacy * 1000:>12.3f} {series * 1000:>12.3f} {legacy / series:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
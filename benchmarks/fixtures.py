@@ -0,0 +1,126 @@
+"""بيانات السوق المسجلة التي يخدمها stub_exchange.py
+
+    python benchmarks/fixtures.py generate            # بيانات ثابتة (seed) بصيغة Binance
+    python benchmarks/fixtures.py record --symbols BTCUSDT ETHUSDT SOLUSDT BNBUSDT
+
+الملفات: exchangeInfo.json و ticker_24hr.json و klines/<SYMBOL>_<interval>.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchange_client import BINANCE_API_URL, INTERVAL_MS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASE_SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT', 'DOGEUSDT', 'ADAUSDT', 'LINKUSDT')
+FIXTURE_CANDLES = 1000
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+
+
+def generate(path=FIXTURES_DIR, symbols=BASE_SYMBOLS, interval='5m', candles=FIXTURE_CANDLES, seed=7):
+    """إنشاء بيانات ثابتة قابلة للتكرار بنفس صيغة استجابات Binance"""
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_MS[interval]
+    start = 1_700_000_000_000 // step * step
+
+    _write(os.path.join(path, 'exchangeInfo.json'), {
+        'timezone': 'UTC',
+        'serverTime': start + candles * step,
+        'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': 6000}],
+        'symbols': [
+            {'symbol': symbol, 'status': 'TRADING', 'baseAsset': symbol[:-4], 'quoteAsset': 'USDT'}
+            for symbol in symbols
+        ],
+    })
+
+    tickers = []
+    for symbol in symbols:
+        price = float(rng.uniform(0.1, 50000))
+        closes = price * np.exp(np.cumsum(rng.normal(0, 0.004, candles)))
+        opens = np.concatenate([[price], closes[:-1]])
+        wick = np.abs(rng.normal(0, 0.002, candles)) * closes
+        highs = np.maximum(opens, closes) + wick
+        lows = np.minimum(opens, closes) - wick
+        volumes = rng.lognormal(5, 1, candles)
+
+        rows = []
+        for i in range(candles):
+            open_time = start + i * step
+            rows.append([
+                open_time, f"{opens[i]:.8f}", f"{highs[i]:.8f}", f"{lows[i]:.8f}", f"{closes[i]:.8f}",
+                f"{volumes[i]:.8f}", open_time + step - 1, f"{volumes[i] * closes[i]:.8f}",
+                int(rng.integers(100, 5000)), f"{volumes[i] / 2:.8f}", f"{volumes[i] * closes[i] / 2:.8f}", "0"
+            ])
+        _write(os.path.join(path, 'klines', f"{symbol}_{interval}.json"), rows)
+
+        day = slice(-288, None)
+        quote_volume = float((volumes[day] * closes[day]).sum())
+        tickers.append({
+            'symbol': symbol,
+            'priceChange': f"{closes[-1] - closes[-288]:.8f}",
+            'priceChangePercent': f"{(closes[-1] / closes[-288] - 1) * 100:.3f}",
+            'lastPrice': f"{closes[-1]:.8f}",
+            'bidPrice': f"{closes[-1] * 0.9999:.8f}",
+            'askPrice': f"{closes[-1] * 1.0001:.8f}",
+            'highPrice': f"{highs[day].max():.8f}",
+            'lowPrice': f"{lows[day].min():.8f}",
+            'volume': f"{volumes[day].sum():.8f}",
+            'quoteVolume': f"{quote_volume:.8f}",
+            'count': int(rng.integers(10_000, 1_000_000)),
+        })
+    _write(os.path.join(path, 'ticker_24hr.json'), tickers)
+
+
+def record(path=FIXTURES_DIR, symbols=BASE_SYMBOLS, interval='5m', candles=FIXTURE_CANDLES,
+           base_url=BINANCE_API_URL):
+    """تسجيل استجابات حقيقية من Binance (مرة واحدة، ثم تعمل المقاييس بدون شبكة)"""
+    import requests
+
+    info = requests.get(f"{base_url}/api/v3/exchangeInfo", params={'symbols': json.dumps(list(symbols))},
+                        timeout=10).json()
+    _write(os.path.join(path, 'exchangeInfo.json'), info)
+    tickers = requests.get(f"{base_url}/api/v3/ticker/24hr", params={'symbols': json.dumps(list(symbols))},
+                           timeout=10).json()
+    _write(os.path.join(path, 'ticker_24hr.json'), tickers)
+    for symbol in symbols:
+        rows = requests.get(f"{base_url}/api/v3/klines",
+                            params={'symbol': symbol, 'interval': interval, 'limit': candles}, timeout=10).json()
+        _write(os.path.join(path, 'klines', f"{symbol}_{interval}.json"), rows)
+        time.sleep(0.1)
+
+
+def ensure(path=FIXTURES_DIR):
+    """إنشاء البيانات الثابتة إذا لم تكن موجودة"""
+    if not os.path.exists(os.path.join(path, 'exchangeInfo.json')):
+        generate(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('mode', choices=['generate', 'record'])
+    parser.add_argument('--path', default=FIXTURES_DIR)
+    parser.add_argument('--symbols', nargs='+', default=list(BASE_SYMBOLS))
+    parser.add_argument('--interval', default='5m')
+    args = parser.parse_args()
+
+    if args.mode == 'generate':
+        generate(args.path, args.symbols, args.interval)
+    else:
+        record(args.path, args.symbols, args.interval)
+    print(f"✅ fixtures written to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
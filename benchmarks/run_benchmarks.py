@@ -0,0 +1,226 @@
+"""مجموعة مقاييس قابلة للتكرار: البوت كاملاً ضد خادم Binance محلي (stub_exchange.py)
+
+تقيس لكل حجم (عدد العملات): زمن جلب الشموع (أول مرة ثم تزايدياً)، حساب المؤشرات
+والنقاط لكل عملة ودفعة واحدة، دورة التحليل كاملة، وذروة الذاكرة. النتائج تُحفظ
+في benchmarks/results/<timestamp>.json ويمكن مقارنتها بتشغيل سابق.
+
+    python benchmarks/run_benchmarks.py --sizes 50 500 2000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/20260101-120000.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from advanced_bot import AdvancedTradingBot
+
+import stub_exchange
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def start_stub(symbols, latency):
+    """تشغيل الخادم المحلي في عملية منفصلة (حتى لا يشارك البوت نفس GIL)"""
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(target=stub_exchange.serve, args=(symbols, 0, latency, ready), daemon=True)
+    process.start()
+    port = ready.get(timeout=60)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)), 4),
+        'p95_ms': round(float(np.percentile(samples, 95)), 4),
+        'mean_ms': round(float(samples.mean()), 4),
+    }
+
+
+def timed_map(bot, func, items):
+    """تنفيذ func على العناصر عبر مجمع الجلب مع قياس زمن كل استدعاء"""
+    durations = []
+
+    def call(item):
+        start = time.perf_counter()
+        result = func(item)
+        durations.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    results = bot.client.map(call, items)
+    return results, durations, time.perf_counter() - start
+
+
+def bench_size(size, latency, repeat, real_limits=False):
+    """جميع المقاييس لعدد size من العملات
+
+    real_limits: إبقاء حد الوزن الحقيقي (6000/دقيقة من exchangeInfo) فيظهر
+    انتظار المحدد في النتائج؛ افتراضياً يُرفع الحد لقياس البوت وحده.
+    """
+    process, base_url = start_stub(size, latency)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot = AdvancedTradingBot(base_url=base_url)
+        if not real_limits:
+            bot.client.rate_limiter.set_limit(10 ** 9)  # قياس البوت وليس المحدد
+        bot.scan_universe = True
+        symbols = bot.cycle_symbols()
+        result = {'symbols': len(symbols)}
+
+        # جلب الشموع: أول مرة (limit كامل) ثم تزايدياً (startTime)
+        batch_data, durations, wall = timed_map(bot, bot.get_klines_data, symbols)
+        result['klines_cold'] = dict(percentiles(durations), wall_s=round(wall, 4))
+        batch_data, durations, wall = timed_map(bot, bot.get_klines_data, symbols)
+        result['klines_warm'] = dict(percentiles(durations), wall_s=round(wall, 4))
+        batch_data = [data for data in batch_data if data]
+
+        # المؤشرات ثم النقاط لكل عملة على حدة (كل مرحلة بزمنها)
+        indicator_durations, scoring_durations = [], []
+        for data in batch_data:
+            start = time.perf_counter()
+            indicators = bot.calculate_advanced_indicators(data)
+            middle = time.perf_counter()
+            bot.generate_trading_signal('BENCH', data, indicators)
+            indicator_durations.append(middle - start)
+            scoring_durations.append(time.perf_counter() - middle)
+        result['per_symbol_indicators'] = dict(percentiles(indicator_durations),
+                                               total_s=round(sum(indicator_durations), 4))
+        result['per_symbol_scoring'] = dict(percentiles(scoring_durations),
+                                            total_s=round(sum(scoring_durations), 4))
+
+        # نفس الحساب دفعة واحدة (مصفوفة عملات × شموع)
+        names = [f"S{i}" for i in range(len(batch_data))]
+        best_indicators = best_scoring = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            groups = bot.calculate_indicators_batch(batch_data)
+            middle = time.perf_counter()
+            for indices, matrix in groups:
+                bot.score_signals_batch(names, batch_data, indices, matrix)
+            best_indicators = min(best_indicators, middle - start)
+            best_scoring = min(best_scoring, time.perf_counter() - middle)
+        result['batch_indicators_s'] = round(best_indicators, 6)
+        result['batch_scoring_s'] = round(best_scoring, 6)
+
+        # دورة التحليل كاملة: مخزن شموع فارغ (بنفس سعة البوت) ثم دافئ
+        bot.candle_cache = type(bot.candle_cache)(capacity=bot.candle_cache.capacity)
+        bot.short_history.clear()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            signals = bot.run_analysis_cycle()
+            result['cycle_cold_s'] = round(time.perf_counter() - start, 4)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            cycles = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                bot.run_analysis_cycle()
+                cycles.append(time.perf_counter() - start)
+        result['cycle_warm_s'] = round(min(cycles), 4)
+        result['signals'] = len(signals)
+        result['tracemalloc_peak_mb'] = round(peak / 2 ** 20, 2)
+        result['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        wait = bot.metrics.histograms.get(('exchange_rate_limit_wait_seconds', ()))
+        result['rate_limit_wait_s'] = round(wait.sum if wait else 0.0, 4)
+
+        bot.client.close()
+        return result
+    finally:
+        process.terminate()
+        process.join()
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(current, previous):
+    """طباعة التغير النسبي لكل مقياس زمني مقارنة بتشغيل سابق"""
+    print(f"\n📊 مقارنة مع {previous['meta'].get('git_commit')} ({previous['meta'].get('timestamp')})")
+    for size, metrics in current['results'].items():
+        old = previous['results'].get(size)
+        if not old:
+            continue
+        print(f"  {size} عملة:")
+        for name, value in metrics.items():
+            if name in ('symbols', 'signals'):
+                continue
+            before, after = old.get(name), value
+            if isinstance(value, dict):
+                key = 'p50_ms' if 'p50_ms' in value else None
+                before, after = (before or {}).get(key), value.get(key)
+                name = f"{name}.{key}"
+            if not isinstance(after, (int, float)) or not before:
+                continue
+            change = (after - before) / before * 100
+            marker = '🔴' if change > 10 else '🟢' if change < -10 else '⚪'
+            print(f"    {marker} {name:<32} {before:>10} → {after:<10} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--latency-ms', type=float, default=0, help='تأخير مصطنع لكل طلب في الخادم المحلي')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', help='ملف نتائج سابق للمقارنة')
+    parser.add_argument('--real-limits', action='store_true',
+                        help='إبقاء حد الوزن الحقيقي (قياس انتظار المحدد أيضاً)')
+    parser.add_argument('--output', help='مسار ملف النتائج (افتراضياً benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    report = {'meta': metadata(), 'results': {}}
+    report['meta']['latency_ms'] = args.latency_ms
+    report['meta']['real_limits'] = args.real_limits
+    for size in args.sizes:
+        print(f"⏱️ {size} عملة...")
+        result = bench_size(size, args.latency_ms / 1000, args.repeat, args.real_limits)
+        report['results'][str(size)] = result
+        print(f"   klines cold p50 {result['klines_cold']['p50_ms']}ms | warm p50 {result['klines_warm']['p50_ms']}ms"
+              f" | cycle cold {result['cycle_cold_s']}s warm {result['cycle_warm_s']}s"
+              f" | indicators batch {result['batch_indicators_s']}s vs per-symbol {result['per_symbol_indicators']['total_s']}s"
+              f" | scoring batch {result['batch_scoring_s']}s vs per-symbol {result['per_symbol_scoring']['total_s']}s"
+              f" | limiter wait {result['rate_limit_wait_s']}s")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ النتائج: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
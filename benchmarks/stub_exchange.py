@@ -0,0 +1,166 @@
+"""خادم HTTP محلي يحاكي واجهة Binance من البيانات المسجلة (بدون شبكة)
+
+يوسّع البيانات إلى أي عدد من العملات: العملات الإضافية BENCH0001USDT ...
+تعيد استخدام شموع العملات المسجلة بالتناوب. أوقات الشموع تُزاح بحيث
+تكون آخر شمعة هي الشمعة الحالية قيد التكوين.
+
+    python benchmarks/stub_exchange.py --symbols 500 --port 8765 --latency-ms 20
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchange_client import INTERVAL_MS
+
+import fixtures
+
+
+class StubExchange:
+    """بيانات السوق الموسعة لعدد symbols من العملات"""
+
+    def __init__(self, symbols, path=fixtures.FIXTURES_DIR, latency=0.0):
+        fixtures.ensure(path)
+        self.latency = latency
+        with open(os.path.join(path, 'exchangeInfo.json')) as f:
+            self.exchange_info = json.load(f)
+        with open(os.path.join(path, 'ticker_24hr.json')) as f:
+            base_tickers = {ticker['symbol']: ticker for ticker in json.load(f)}
+
+        self.klines = {}
+        folder = os.path.join(path, 'klines')
+        for name in sorted(os.listdir(folder)):
+            symbol, interval = name[:-5].rsplit('_', 1)
+            with open(os.path.join(folder, name)) as f:
+                self.klines[(symbol, interval)] = json.load(f)
+
+        base = sorted({symbol for symbol, _ in self.klines})
+        names = base[:symbols] + [f"BENCH{i:04d}USDT" for i in range(1, symbols - len(base) + 1)]
+        self.source = {name: base[i % len(base)] for i, name in enumerate(names)}
+
+        template = {entry['symbol']: entry for entry in self.exchange_info['symbols']}
+        self.exchange_info = dict(self.exchange_info, symbols=[
+            dict(template.get(self.source[name], {}), symbol=name, status='TRADING',
+                 baseAsset=name[:-4], quoteAsset='USDT')
+            for name in names
+        ])
+        self.tickers = [dict(base_tickers[self.source[name]], symbol=name) for name in names]
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.weight_minute = None
+        self.used_weight = 0
+        self.replay_hidden = 0  # آخر شموع مسجلة لم يصلها البث بعد (stub_stream)
+
+    def add_weight(self, weight, now=None):
+        """الوزن المستخدم في الدقيقة الحالية بعد هذا الطلب (يُصفَّر مع كل دقيقة كما في Binance)"""
+        minute = int((time.time() if now is None else now) // 60)
+        with self.lock:
+            if minute != self.weight_minute:
+                self.weight_minute, self.used_weight = minute, 0
+            self.used_weight += weight
+            return self.used_weight
+
+    def shift(self, rows, step):
+        """إزاحة الأوقات بحيث تكون آخر شمعة مسجلة هي الشمعة الحالية"""
+        return int(time.time() * 1000) // step * step - rows[-1][0]
+
+    def klines_response(self, symbol, interval, limit, start_time):
+        """شموع العملة مع إزاحة الأوقات لتنتهي بالشمعة الحالية"""
+        rows = self.klines.get((self.source.get(symbol), interval))
+        if rows is None:
+            return None
+        step = INTERVAL_MS[interval]
+        shift = self.shift(rows, step)
+        hidden = self.replay_hidden
+        visible = rows[:len(rows) - hidden]
+
+        first = 0 if start_time is None else max(0, (start_time - shift - rows[0][0] + step - 1) // step)
+        key = (self.source[symbol], interval, shift, hidden, first, limit)
+        body = self.cache.get(key)
+        if body is None:
+            selected = visible[first:first + limit] if start_time is not None else visible[-limit:]
+            shifted = [[row[0] + shift] + row[1:6] + [row[6] + shift] + row[7:] for row in selected]
+            body = json.dumps(shifted, separators=(',', ':')).encode()
+            self.cache[key] = body
+        return body
+
+    def forming_candle(self, symbol, interval):
+        """آخر شمعة معروضة عبر REST (قيد التكوين) بعد الإزاحة"""
+        rows = self.klines.get((self.source.get(symbol), interval))
+        if rows is None:
+            return None
+        shift = self.shift(rows, INTERVAL_MS[interval])
+        row = rows[len(rows) - self.replay_hidden - 1]
+        return [row[0] + shift] + row[1:6] + [row[6] + shift]
+
+    def handle(self, path, query):
+        """(الحالة، المحتوى، الوزن) لكل مسار مدعوم"""
+        if path == '/api/v3/exchangeInfo':
+            return 200, json.dumps(self.exchange_info).encode(), 20
+        if path == '/api/v3/ticker/24hr':
+            if 'symbol' in query:
+                ticker = next((t for t in self.tickers if t['symbol'] == query['symbol']), None)
+                return (404, b'{}', 2) if ticker is None else (200, json.dumps(ticker).encode(), 2)
+            return 200, json.dumps(self.tickers).encode(), 80
+        if path == '/api/v3/klines':
+            start_time = int(query['startTime']) if 'startTime' in query else None
+            body = self.klines_response(query['symbol'], query.get('interval', '5m'),
+                                        int(query.get('limit', 500)), start_time)
+            return (400, b'{"code":-1121,"msg":"Invalid symbol."}', 2) if body is None else (200, body, 2)
+        return 404, b'{}', 1
+
+
+def make_server(exchange, port=0):
+    """خادم HTTP/1.1 (اتصالات دائمة) فوق StubExchange"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if exchange.latency:
+                time.sleep(exchange.latency)
+            status, body, weight = exchange.handle(url.path, query)
+            used_weight = exchange.add_weight(weight)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-MBX-USED-WEIGHT-1M', str(used_weight))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(symbols, port, latency, ready=None):
+    """تشغيل الخادم (يُستخدم أيضاً كهدف لعملية منفصلة)"""
+    server = make_server(StubExchange(symbols, latency=latency), port)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    args = parser.parse_args()
+    print(f"📡 stub exchange: http://127.0.0.1:{args.port} ({args.symbols} symbols)")
+    serve(args.symbols, args.port, args.latency_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
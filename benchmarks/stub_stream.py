@@ -0,0 +1,160 @@
+"""خادم WebSocket محلي يحاكي بث شموع Binance (combined streams) فوق StubExchange
+
+يعيد تشغيل آخر replay شمعة مسجلة بسرعة: كل candle_seconds تُرسل تحديثات
+مؤقتة للشمعة قيد التكوين (x=false) ثم إغلاقها (x=true) وينتقل للتالية.
+واجهة REST في نفس العملية لا تعرض إلا الشموع التي وصلها البث، فما يُغلق
+أثناء انقطاع الاتصال يبقى متاحاً عبر REST لسد الفجوة. كل drop_every شمعة
+تُغلق جميع الاتصالات من جهة الخادم لاختبار إعادة الاتصال.
+
+    python benchmarks/stub_stream.py --symbols 50 --port 8765 --ws-port 8766 --replay 100
+    python advanced_bot.py --stream --base-url http://127.0.0.1:8765 --ws-url ws://127.0.0.1:8766
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_exchange
+
+
+class StreamStub:
+    """إعادة تشغيل الشموع المسجلة عبر WebSocket لكل المشتركين"""
+
+    def __init__(self, exchange, interval='5m', replay=100, candle_seconds=0.5,
+                 ticks_per_candle=2, drop_every=5):
+        self.exchange = exchange
+        self.interval = interval
+        self.candle_seconds = candle_seconds
+        self.ticks_per_candle = ticks_per_candle
+        self.drop_every = drop_every
+        self.clients = {}  # الاتصال ← رموز المشترك فيها
+        self.closed_candles = 0
+        self.connections = 0
+        self.drops = 0
+        self.subscribed = None
+        exchange.replay_hidden = replay
+
+    def kline(self, symbol, fraction=None):
+        """رسالة kline للشمعة قيد التكوين (fraction: جزء الشمعة المنقضي، None = إغلاق)"""
+        candle = self.exchange.forming_candle(symbol, self.interval)
+        if candle is None:
+            return None
+        open_time, open_, high, low, close, volume, close_time = candle
+        if fraction is not None:
+            # تحديث مؤقت: السعر بين الافتتاح والإغلاق النهائي
+            price = float(open_) + (float(close) - float(open_)) * fraction
+            high, low = str(max(float(open_), price)), str(min(float(open_), price))
+            close, volume = str(price), str(float(volume) * fraction)
+        return json.dumps({
+            'stream': f"{symbol.lower()}@kline_{self.interval}",
+            'data': {
+                'e': 'kline', 'E': int(time.time() * 1000), 's': symbol,
+                'k': {'t': open_time, 'T': close_time, 's': symbol, 'i': self.interval,
+                      'o': open_, 'h': high, 'l': low, 'c': close, 'v': volume,
+                      'x': fraction is None},
+            },
+        })
+
+    async def handler(self, ws):
+        """اتصال واحد: انتظار SUBSCRIBE ثم البقاء حتى يُغلق"""
+        request = getattr(ws, 'request', None)
+        path = request.path if request is not None else ws.path
+        if path != '/stream':
+            await ws.close(code=1008, reason='unknown path')
+            return
+        message = json.loads(await ws.recv())
+        if message.get('method') != 'SUBSCRIBE':
+            await ws.close(code=1008, reason='expected SUBSCRIBE')
+            return
+        symbols = [stream.split('@')[0].upper() for stream in message.get('params', [])]
+        await ws.send(json.dumps({'result': None, 'id': message.get('id')}))
+
+        self.connections += 1
+        self.clients[ws] = [symbol for symbol in symbols if symbol in self.exchange.source]
+        self.subscribed.set()
+        try:
+            await ws.wait_closed()
+        finally:
+            self.clients.pop(ws, None)
+
+    async def broadcast(self, fraction=None):
+        for ws, symbols in list(self.clients.items()):
+            try:
+                for symbol in symbols:
+                    message = self.kline(symbol, fraction)
+                    if message is not None:
+                        await ws.send(message)
+            except Exception:
+                self.clients.pop(ws, None)  # انقطع أثناء الإرسال
+
+    async def replay(self):
+        """تقدم الشموع: تحديثات مؤقتة ثم إغلاق، وقطع الاتصالات دورياً"""
+        await self.subscribed.wait()  # البدء مع أول مشترك
+        pause = self.candle_seconds / (self.ticks_per_candle + 1)
+        while self.exchange.replay_hidden > 0:
+            for tick in range(1, self.ticks_per_candle + 1):
+                await asyncio.sleep(pause)
+                await self.broadcast(tick / (self.ticks_per_candle + 1))
+            await asyncio.sleep(pause)
+            await self.broadcast()
+
+            # الشمعة التالية تصبح الحالية في REST أيضاً
+            with self.exchange.lock:
+                self.exchange.replay_hidden -= 1
+            self.closed_candles += 1
+
+            if self.drop_every and self.closed_candles % self.drop_every == 0 and self.clients:
+                self.drops += 1
+                for ws in list(self.clients):
+                    await ws.close(code=1001, reason='stub drop')
+        print(f"✅ انتهت إعادة التشغيل: {self.closed_candles} شمعة، {self.drops} قطع اتصال")
+
+    async def serve(self, port=0, ready=None):
+        import websockets
+        self.subscribed = asyncio.Event()
+        async with websockets.serve(self.handler, '127.0.0.1', port) as server:
+            ws_port = next(iter(server.sockets)).getsockname()[1]
+            if ready is not None:
+                ready(ws_port)
+            await self.replay()
+            await asyncio.Future()  # البقاء متاحاً بعد انتهاء الشموع
+
+
+def serve(symbols, port, ws_port, interval='5m', replay=100, candle_seconds=0.5,
+          drop_every=5, latency=0.0, ready=None):
+    """REST و WebSocket فوق نفس البيانات (يُستخدم أيضاً كهدف لعملية منفصلة)"""
+    exchange = stub_exchange.StubExchange(symbols, latency=latency)
+    http = stub_exchange.make_server(exchange, port)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    stream = StreamStub(exchange, interval, replay, candle_seconds, drop_every=drop_every)
+    on_ready = None
+    if ready is not None:
+        on_ready = lambda actual: ready.put((http.server_address[1], actual))
+    asyncio.run(stream.serve(ws_port, on_ready))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ws-port', type=int, default=8766)
+    parser.add_argument('--interval', default='5m')
+    parser.add_argument('--replay', type=int, default=100, help='عدد الشموع المعاد تشغيلها')
+    parser.add_argument('--candle-seconds', type=float, default=0.5, help='مدة كل شمعة بالثواني')
+    parser.add_argument('--drop-every', type=int, default=5, help='قطع الاتصالات كل N شمعة (0 = أبداً)')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    args = parser.parse_args()
+    print(f"📡 stub exchange: http://127.0.0.1:{args.port} + ws://127.0.0.1:{args.ws_port} "
+          f"({args.symbols} symbols, {args.replay} candles)")
+    serve(args.symbols, args.port, args.ws_port, args.interval, args.replay,
+          args.candle_seconds, args.drop_every, args.latency_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+
+from exchange_client import KLINE_COLUMNS, OPEN_TIME
+
+
+class CandleRingBuffer:
+    """مخزن دائري ثابت الحجم لشموع عملة واحدة
+
+    كل شمعة تُكتب مرتين (في الموضع وفي نسخته بعد السعة) حتى تبقى
+    آخر الشموع دائماً شريحة متصلة يمكن إرجاعها بدون نسخ.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((KLINE_COLUMNS, 2 * capacity), dtype=np.float64)
+        self.head = 0  # موضع الكتابة التالي
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def last_open_time(self):
+        """وقت فتح آخر شمعة محفوظة (أو None إذا كان المخزن فارغاً)"""
+        if not self.size:
+            return None
+        return self.data[OPEN_TIME, self.head - 1 + self.capacity]
+
+    def update(self, rows):
+        """دمج شموع جديدة (n × 6) مرتبة زمنياً
+
+        الشمعة التي لها نفس وقت فتح آخر شمعة تستبدلها في مكانها
+        (الشمعة التي ما زالت قيد التكوين)، والأقدم منها تُتجاهل.
+        """
+        if not len(rows):
+            return
+        with self.lock:
+            self._update(rows)
+
+    def _update(self, rows):
+        last = self.last_open_time()
+        if last is not None:
+            rows = rows[rows[:, OPEN_TIME] >= last]
+            if len(rows) and rows[0, OPEN_TIME] == last:
+                slot = (self.head - 1) % self.capacity
+                self.data[:, slot] = rows[0]
+                self.data[:, slot + self.capacity] = rows[0]
+                rows = rows[1:]
+        
+        rows = rows[-self.capacity:]
+        count = len(rows)
+        if not count:
+            return
+        
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.data[:, slots] = rows.T
+        self.data[:, slots + self.capacity] = rows.T
+        self.head = (self.head + count) % self.capacity
+        self.size = min(self.capacity, self.size + count)
+
+    def view(self, limit=None):
+        """آخر limit شمعة كمصفوفة (6 × n) بدون نسخ"""
+        count = self.size if limit is None else min(limit, self.size)
+        end = self.head + self.capacity
+        return self.data[:, end - count:end]
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+
+class CandleCache:
+    """مخازن الشموع لكل (عملة، فاصل زمني)"""
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def get(self, symbol, interval):
+        """المخزن الخاص بالعملة (يُنشأ عند أول استخدام)"""
+        key = (symbol, interval)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            with self.lock:
+                buffer = self.buffers.setdefault(key, CandleRingBuffer(self.capacity))
+        return buffer
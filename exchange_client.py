@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # مفكك JSON أسرع إن كان مثبتاً
+    json_loads = json.loads
+
+BINANCE_API_URL = "https://api.binance.com"
+
+# أوزان الطلبات حسب توثيق Binance
+EXCHANGE_INFO_WEIGHT = 20
+KLINES_WEIGHT = 2
+TICKER_24HR_WEIGHT = 2
+TICKER_24HR_ALL_WEIGHT = 80
+
+# الحد الافتراضي لوزن الطلبات في الدقيقة
+DEFAULT_WEIGHT_LIMIT = 6000
+
+# أقصى عدد شموع في طلب klines واحد
+MAX_KLINES_LIMIT = 1000
+
+# مدة كل فاصل زمني بالميلي ثانية
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000,
+}
+
+# أعمدة الشموع المحفوظة: وقت الفتح + OHLCV
+KLINE_COLUMNS = 6
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(KLINE_COLUMNS)
+
+# عدد الحقول في كل شمعة من استجابة klines
+KLINE_FIELDS = 12
+
+# وصف قياسات العميل في /metrics (# HELP)
+EXCHANGE_METRICS = {
+    'exchange_request_duration_seconds': 'Duration of REST requests to the exchange',
+    'exchange_request_weight_total': 'Request weight sent to the exchange',
+    'exchange_rate_limit_wait_seconds': 'Time spent waiting for the request weight limiter',
+    'exchange_used_weight_1m': 'Used request weight in the current minute reported by the exchange',
+    'exchange_weight_limit_1m': 'Request weight limit per minute',
+    'exchange_http_errors_total': 'HTTP error responses from the exchange',
+    'exchange_timeouts_total': 'Requests to the exchange that timed out',
+    'exchange_connection_errors_total': 'Requests to the exchange that failed to connect',
+}
+
+# حذف علامات الاقتباس والأقواس يحوّل [[1,"2",...],[...]] إلى حقول مفصولة بفواصل فقط
+_KLINE_STRIP = b'"[] \n'
+
+
+def parse_klines(data):
+    """تحويل استجابة klines إلى مصفوفة (n × 6) من float64
+
+    data إما محتوى الاستجابة الخام (bytes) فتُحوَّل الأعمدة الستة المطلوبة
+    فقط مباشرة إلى المصفوفة (بدون تفكيك JSON ولا صفوف Python وسيطة)، أو
+    قائمة مفككة مسبقاً.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        text = bytes(data).translate(None, _KLINE_STRIP)
+        if not text:
+            return np.empty((0, KLINE_COLUMNS), dtype=np.float64)
+        fields = text.split(b',')
+        if len(fields) % KLINE_FIELDS == 0:
+            rows = np.empty((len(fields) // KLINE_FIELDS, KLINE_COLUMNS), dtype=np.float64)
+            try:
+                for column in range(KLINE_COLUMNS):
+                    rows[:, column] = fields[column::KLINE_FIELDS]
+                return rows
+            except ValueError:
+                pass
+        data = json_loads(data)  # شكل غير متوقع: التفكيك العادي
+    if not data:
+        return np.empty((0, KLINE_COLUMNS), dtype=np.float64)
+    return np.array([candle[:KLINE_COLUMNS] for candle in data], dtype=np.float64)
+
+
+def parse_ticker_volumes(tickers, allowed_symbols=None):
+    """تحويل بيانات ticker/24hr لكل السوق إلى مصفوفتين (الرموز، حجم التداول بالـ USDT)"""
+    allowed = set(allowed_symbols) if allowed_symbols is not None else None
+    rows = [
+        (ticker['symbol'], ticker.get('quoteVolume', 0))
+        for ticker in tickers
+        if allowed is None or ticker['symbol'] in allowed
+    ]
+    symbols = np.array([symbol for symbol, _ in rows], dtype=object)
+    volumes = np.array([volume for _, volume in rows], dtype=np.float64)
+    return symbols, volumes
+
+
+def top_n_indices(values, n):
+    """فهارس أعلى n قيمة مرتبة تنازلياً (بدون ترتيب المصفوفة كاملة)"""
+    if n >= len(values):
+        return np.argsort(-values, kind='stable')
+    top = np.argpartition(-values, n - 1)[:n]
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+class WeightRateLimiter:
+    """محدد معدل (Token Bucket) يتبع ميزانية وزن الطلبات في Binance"""
+
+    def __init__(self, max_weight=DEFAULT_WEIGHT_LIMIT, period=60, safety_ratio=0.8):
+        self.period = period
+        self.safety_ratio = safety_ratio
+        self.lock = threading.Lock()
+        self.blocked_until = 0.0
+        self.set_limit(max_weight)
+
+    def set_limit(self, max_weight):
+        """تحديث الميزانية (مثلاً من rateLimits في exchangeInfo)"""
+        with self.lock:
+            self.max_weight = max_weight
+            self.capacity = max_weight * self.safety_ratio
+            self.refill_rate = self.capacity / self.period
+            self.tokens = self.capacity
+            self.last_refill = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def acquire(self, weight=1):
+        """الانتظار حتى يتوفر وزن كافٍ ثم خصمه"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self._refill()
+                    if self.tokens >= weight:
+                        self.tokens -= weight
+                        return
+                    wait = (weight - self.tokens) / self.refill_rate
+            time.sleep(wait)
+
+    def sync_used_weight(self, used_weight):
+        """مزامنة الرصيد مع الوزن المستخدم الذي يبلغ عنه الخادم"""
+        with self.lock:
+            self._refill()
+            remaining = self.capacity - used_weight
+            self.tokens = max(0.0, min(self.tokens, remaining))
+
+    def block(self, seconds):
+        """إيقاف جميع الطلبات مؤقتاً (عند 429/418)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class BinanceClient:
+    """عميل HTTP مع اتصالات مُجمّعة وجلب متوازٍ ومحدد وزن"""
+
+    def __init__(self, base_url=BINANCE_API_URL, max_workers=32, rate_limiter=None, timeout=10, metrics=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or WeightRateLimiter()
+        self.metrics = metrics  # سجل القياسات (اختياري)
+        if metrics:
+            for name, text in EXCHANGE_METRICS.items():
+                metrics.describe(name, text)
+
+        # جلسة واحدة بعدد اتصالات يكفي جميع الخيوط
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+
+    def get(self, path, params=None, weight=1, timeout=None, raw=False):
+        """طلب GET مع احترام ميزانية الوزن (raw: المحتوى الخام bytes بدون تفكيك JSON)"""
+        metrics = self.metrics
+        start = time.perf_counter()
+        self.rate_limiter.acquire(weight)
+        if metrics:
+            metrics.observe('exchange_rate_limit_wait_seconds', time.perf_counter() - start)
+            start = time.perf_counter()
+
+        try:
+            response = self.session.get(
+                self.base_url + path, params=params, timeout=timeout or self.timeout
+            )
+        except requests.Timeout:
+            if metrics:
+                metrics.increment('exchange_timeouts_total', path=path)
+            raise
+        except requests.ConnectionError:
+            if metrics:
+                metrics.increment('exchange_connection_errors_total', path=path)
+            raise
+
+        used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+        if used_weight:
+            self.rate_limiter.sync_used_weight(int(used_weight))
+
+        if metrics:
+            metrics.observe('exchange_request_duration_seconds', time.perf_counter() - start, path=path)
+            metrics.increment('exchange_request_weight_total', weight, path=path)
+            if used_weight:
+                metrics.set_gauge('exchange_used_weight_1m', int(used_weight))
+            if response.status_code >= 400:
+                metrics.increment('exchange_http_errors_total', status=response.status_code, path=path)
+
+        if response.status_code in (418, 429):
+            retry_after = int(response.headers.get('Retry-After', 60))
+            self.rate_limiter.block(retry_after)
+
+        response.raise_for_status()
+        return response.content if raw else json_loads(response.content)
+
+    def klines_since(self, symbol, interval, start_ms):
+        """صفحات الشموع (مصفوفات n × 6) من start_ms حتى الآن، حتى 1000 شمعة لكل طلب"""
+        cursor = int(start_ms)
+        while True:
+            data = self.get('/api/v3/klines', params={
+                'symbol': symbol, 'interval': interval, 'startTime': cursor, 'limit': MAX_KLINES_LIMIT
+            }, weight=KLINES_WEIGHT, raw=True)
+            rows = parse_klines(data)
+            if len(rows):
+                yield rows
+            if len(rows) < MAX_KLINES_LIMIT:
+                return
+            cursor = int(rows[-1, OPEN_TIME] + INTERVAL_MS[interval])
+
+    def configure_rate_limits(self, rate_limits):
+        """ضبط المحدد من قائمة rateLimits في exchangeInfo"""
+        for limit in rate_limits:
+            if limit.get('rateLimitType') == 'REQUEST_WEIGHT' and limit.get('interval') == 'MINUTE':
+                per_minute = limit['limit'] / limit.get('intervalNum', 1)
+                self.rate_limiter.set_limit(per_minute)
+                if self.metrics:
+                    self.metrics.set_gauge('exchange_weight_limit_1m', per_minute)
+                return
+
+    def map(self, func, items):
+        """تنفيذ func على جميع العناصر بالتوازي مع الحفاظ على الترتيب"""
+        return list(self.executor.map(func, items))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,429 @@
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+# أقل عدد شموع لحساب جميع المؤشرات (تغير 4 ساعات = 48 شمعة 5 دقائق)
+MIN_CANDLES = 48
+
+# مدة كل مؤشر تغير بالميلي ثانية (الأسماء بالمدة وليس بعدد الشموع)
+PRICE_CHANGE_SPANS = (('price_change_5m', 300_000), ('price_change_1h', 3_600_000),
+                      ('price_change_4h', 14_400_000))
+
+
+@lru_cache(maxsize=32)
+def _ema_weights(span, length):
+    """مصفوفة أوزان EMA (length × length) مطابقة لـ pandas ewm(span=span, adjust=True)"""
+    decay = 1 - 2 / (span + 1)
+    steps = np.arange(length)
+    exponents = steps[:, None] - steps[None, :]
+    weights = np.where(exponents >= 0, decay ** np.maximum(exponents, 0), 0.0)
+    weights /= weights.sum(axis=1, keepdims=True)
+    weights.setflags(write=False)
+    return weights
+
+
+def ema_matrix(values, span):
+    """سلسلة EMA كاملة لكل صف من مصفوفة (عملات × شموع) بضرب مصفوفات واحد"""
+    return values @ _ema_weights(span, values.shape[1]).T
+
+
+def _decay_filter(values, decay, scale, initial):
+    """y[k] = decay * y[k-1] + scale * x[k] على المحور الأخير بدءاً من initial
+
+    السلسلة تُقسم إلى كتل تُحسب كلها معاً بمجاميع تراكمية موزونة (حجم
+    الكتلة محدود حتى لا تتجاوز الأوزان decay^-k حوالي 1e6)، ثم تُضاف
+    إلى كل كتلة قيم نهايات الكتل السابقة.
+    """
+    n = values.shape[-1]
+    batch_shape = values.shape[:-1]
+    block = min(n, max(1, int(np.log(1e6) / -np.log(decay))))
+    n_blocks = -(-n // block)
+
+    padded = np.zeros(batch_shape + (n_blocks * block,))
+    padded[..., :n] = values
+    chunks = padded.reshape(batch_shape + (n_blocks, block))
+
+    steps = np.arange(1, block + 1)
+    weights = decay ** steps
+    local = weights * (scale * np.cumsum(chunks / weights, axis=-1))
+
+    # الحالة الداخلة لكل كتلة: block_decay ≈ 1e-6 فتأثير الكتل الأبعد من بضع كتل أقل من دقة float64
+    block_decay = decay ** block
+    ends = local[..., -1]
+    carry = block_decay ** np.arange(n_blocks) * np.asarray(initial, dtype=np.float64)[..., None]
+    depth = n_blocks - 1
+    if 0 < block_decay < 1:
+        depth = min(depth, int(np.ceil(np.log(1e-18) / np.log(block_decay))))
+    for lag in range(depth):
+        carry[..., lag + 1:] += block_decay ** lag * ends[..., :n_blocks - 1 - lag]
+
+    out = local + weights * carry[..., None]
+    return out.reshape(batch_shape + (n_blocks * block,))[..., :n]
+
+
+def wilder_smooth(values, period):
+    """تنعيم Wilder على المحور الأخير: بذرة بمتوسط بسيط ثم avg = (avg*(p-1) + x) / p"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+
+    seed = values[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = _decay_filter(values[..., period:], 1 - 1 / period, 1 / period, seed)
+    return out
+
+
+def ema_series(values, span):
+    """سلسلة EMA مطابقة لـ pandas ewm(span, adjust=True) لأي طول (بدون مصفوفة n × n)"""
+    values = np.asarray(values, dtype=np.float64)
+    decay = 1 - 2 / (span + 1)
+    numerator = _decay_filter(values, decay, 1.0, np.zeros(values.shape[:-1]))
+    denominator = (1 - decay ** np.arange(1, values.shape[-1] + 1)) / (1 - decay)
+    return numerator / denominator
+
+
+def rolling_mean(values, window):
+    """متوسط متحرك بسيط، أول window-1 قيمة NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return out
+
+
+def rsi_series(closes, period=14):
+    """سلسلة RSI كاملة (Wilder) في تمريرة واحدة، أول period قيمة NaN"""
+    closes = np.asarray(closes, dtype=np.float64)
+    deltas = np.diff(closes, axis=-1)
+    avg_gain = wilder_smooth(np.maximum(deltas, 0.0), period)
+    avg_loss = wilder_smooth(np.maximum(-deltas, 0.0), period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    rsi = np.where(np.isnan(avg_gain), np.nan, rsi)
+
+    # محاذاة السلسلة مع الأسعار (لا يوجد فرق للشمعة الأولى)
+    pad = np.full(closes.shape[:-1] + (1,), np.nan)
+    return np.concatenate([pad, rsi], axis=-1)
+
+
+def stoch_rsi_series(rsi, period=14):
+    """Stochastic RSI: موقع RSI بين أدنى وأعلى قيمة في آخر period شمعة (نافذة منزلقة)"""
+    rsi = np.asarray(rsi, dtype=np.float64)
+    out = np.full(rsi.shape, np.nan)
+    if rsi.shape[-1] < period:
+        return out
+
+    # أدنى وأعلى قيمة في كل نافذة عبر period مقارنة مُزاحة (أسرع من sliding_window_view().min)
+    count = rsi.shape[-1] - period + 1
+    min_rsi = rsi[..., :count].copy()
+    max_rsi = rsi[..., :count].copy()
+    for offset in range(1, period):
+        np.minimum(min_rsi, rsi[..., offset:offset + count], out=min_rsi)
+        np.maximum(max_rsi, rsi[..., offset:offset + count], out=max_rsi)
+    spread = max_rsi - min_rsi
+    current = rsi[..., period - 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch = np.where(spread == 0, 50.0, (current - min_rsi) / spread * 100)
+    out[..., period - 1:] = np.where(np.isnan(spread), np.nan, stoch)
+    return out
+
+
+def last_or_default(series, default=50.0):
+    """آخر قيمة في السلسلة أو القيمة الافتراضية إن لم تكن متاحة"""
+    last = series[..., -1]
+    return np.where(np.isnan(last), default, last)
+
+
+def price_change_lags(interval_ms=300_000):
+    """عدد الشموع بين الإغلاق الحالي والمرجعي لكل مؤشر تغير على هذا الفاصل
+
+    على الفواصل الأخرى الإزاحة تساوي المدة بالضبط (1h على 15m: 4 شموع).
+    على 5m تبقى الإزاحات التاريخية 1 و 11 و 47 (closes[-2], closes[-12], closes[-48])
+    حتى لا تتغير قيم القواعد الحالية. None إذا كانت المدة أقصر من شمعة.
+    """
+    lags = {}
+    for name, span in PRICE_CHANGE_SPANS:
+        candles = span // interval_ms
+        if not candles:
+            lags[name] = None
+        elif interval_ms == 300_000:
+            lags[name] = max(1, candles - 1)
+        else:
+            lags[name] = candles
+    return lags
+
+
+def compute_indicator_matrix(closes, highs, lows, volumes, period=14, interval_ms=300_000):
+    """حساب جميع المؤشرات لكل العملات في تمريرة واحدة
+
+    المدخلات مصفوفات (عملات × شموع) بنفس الطول، والمخرجات قاموس
+    بنفس مفاتيح calculate_advanced_indicators وقيمه مصفوفات بطول عدد العملات.
+    """
+    n_symbols, n_candles = closes.shape
+    current = closes[:, -1]
+
+    # RSI (Wilder) و Stochastic RSI من نفس السلسلة
+    rsi_values = rsi_series(closes, period)
+    rsi = last_or_default(rsi_values)
+    # آخر قيمة تعتمد فقط على آخر period قيمة RSI
+    stoch_rsi = last_or_default(stoch_rsi_series(rsi_values[:, -period:], period))
+
+    # المتوسطات المتحركة
+    ema_8 = ema_matrix(closes, 8)[:, -1]
+    ema_21 = ema_matrix(closes, 21)[:, -1]
+    sma_50 = closes[:, -50:].mean(axis=1) if n_candles >= 50 else np.full(n_symbols, np.nan)
+
+    # MACD
+    macd = ema_matrix(closes, 12) - ema_matrix(closes, 26)
+    signal_line = ema_matrix(macd, 9)
+    macd_histogram = macd[:, -1] - signal_line[:, -1]
+
+    # حجم التداول
+    volume_avg = volumes[:, -20:].mean(axis=1)
+    positive = volume_avg > 0
+    volume_ratio = np.where(positive, volumes[:, -1] / np.where(positive, volume_avg, 1.0), 1.0)
+
+    # التقلب
+    atr = (highs[:, -14:] - lows[:, -14:]).mean(axis=1)
+    volatility = atr / current * 100
+
+    result = {
+        'rsi': rsi,
+        'stoch_rsi': stoch_rsi,
+        'ema_8': ema_8,
+        'ema_21': ema_21,
+        'sma_50': sma_50,
+        'macd_histogram': macd_histogram,
+        'volume_ratio': volume_ratio,
+        'volatility': volatility,
+    }
+    for name, lag in price_change_lags(interval_ms).items():
+        if lag is None or lag >= n_candles:
+            result[name] = np.full(n_symbols, np.nan)
+        else:
+            result[name] = (current - closes[:, -1 - lag]) / closes[:, -1 - lag] * 100
+    return result
+
+
+def percent_change(closes, periods):
+    """التغير بالنسبة المئوية عن الإغلاق قبل periods شمعة"""
+    out = np.full(closes.shape, np.nan)
+    out[..., periods:] = (closes[..., periods:] - closes[..., :-periods]) / closes[..., :-periods] * 100
+    return out
+
+
+def indicator_series(highs, lows, closes, volumes, period=14, interval_ms=300_000):
+    """قيم المؤشرات عند كل شمعة في التاريخ كاملاً (للاختبار التاريخي)
+
+    كل مفتاح يقابل مفتاحاً في calculate_advanced_indicators، لكن EMA و
+    Wilder هنا بذاكرة من أول شمعة وليس من نافذة آخر 100 شمعة.
+    """
+    rsi = rsi_series(closes, period)
+    macd = ema_series(closes, 12) - ema_series(closes, 26)
+    volume_avg = rolling_mean(volumes, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = np.where(volume_avg > 0, volumes / volume_avg, 1.0)
+
+    series = {
+        'rsi': np.where(np.isnan(rsi), 50.0, rsi),
+        'stoch_rsi': np.nan_to_num(stoch_rsi_series(rsi, period), nan=50.0),
+        'ema_8': ema_series(closes, 8),
+        'ema_21': ema_series(closes, 21),
+        'sma_50': rolling_mean(closes, 50),
+        'macd_histogram': macd - ema_series(macd, 9),
+        'volume_ratio': volume_ratio,
+        'volatility': rolling_mean(highs - lows, 14) / closes * 100,
+    }
+    for name, lag in price_change_lags(interval_ms).items():
+        series[name] = percent_change(closes, lag) if lag is not None else np.full(closes.shape, np.nan)
+    return series
+
+
+class _RunningEMA:
+    """EMA تزايدي مطابق لـ pandas ewm(span, adjust=True)"""
+
+    __slots__ = ('decay', 'num', 'den')
+
+    def __init__(self, span):
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def value(self):
+        return self.num / self.den
+
+    def peek(self, value):
+        return (value + self.decay * self.num) / (1 + self.decay * self.den)
+
+    def push(self, value):
+        self.num = value + self.decay * self.num
+        self.den = 1 + self.decay * self.den
+        return self.num / self.den
+
+
+class _RunningWindow:
+    """مجموع نافذة ثابتة الطول يُحدَّث بإضافة القيمة الجديدة وطرح الأقدم"""
+
+    __slots__ = ('values', 'total')
+
+    def __init__(self, length):
+        self.values = deque(maxlen=length)
+        self.total = 0.0
+
+    def peek_mean(self, value):
+        total = self.total + value
+        count = len(self.values) + 1
+        if len(self.values) == self.values.maxlen:
+            total -= self.values[0]
+            count -= 1
+        return total / count
+
+    def push(self, value):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+
+class IncrementalIndicators:
+    """حالة مؤشرات عملة واحدة تُحدَّث بزمن ثابت مع كل شمعة مغلقة
+
+    update() للشمعة المغلقة، و provisional() لقيم مؤقتة للشمعة قيد
+    التكوين بدون تعديل الحالة. القيم تطابق compute_indicator_matrix عند
+    تغذيتها بنفس الشموع منذ البداية (EMA و Wilder لهما ذاكرة من أول شمعة).
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.ema_8 = _RunningEMA(8)
+        self.ema_21 = _RunningEMA(21)
+        self.ema_12 = _RunningEMA(12)
+        self.ema_26 = _RunningEMA(26)
+        self.macd_signal = _RunningEMA(9)
+
+        # Wilder: مجموع أول period فرق ثم تنعيم
+        self.delta_count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.rsi_window = deque(maxlen=period)
+
+        self.sma_50 = _RunningWindow(50)
+        self.volume_20 = _RunningWindow(20)
+        self.range_14 = _RunningWindow(14)
+        self.closes = deque(maxlen=MIN_CANDLES)
+
+    @classmethod
+    def from_candles(cls, highs, lows, closes, volumes, period=14):
+        """تهيئة الحالة بإعادة تشغيل شموع محفوظة"""
+        state = cls(period)
+        for high, low, close, volume in zip(highs.tolist(), lows.tolist(),
+                                            closes.tolist(), volumes.tolist()):
+            state.update(high, low, close, volume)
+        return state
+
+    def _wilder_step(self, delta):
+        """متوسطا المكاسب والخسائر بعد إضافة فرق جديد (بدون تعديل الحالة)"""
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        count = self.delta_count + 1
+        if count < self.period:
+            return self.avg_gain + gain, self.avg_loss + loss, count
+        if count == self.period:
+            return (self.avg_gain + gain) / self.period, (self.avg_loss + loss) / self.period, count
+        decay = self.period - 1
+        return ((self.avg_gain * decay + gain) / self.period,
+                (self.avg_loss * decay + loss) / self.period, count)
+
+    def _rsi(self, avg_gain, avg_loss, count):
+        if count < self.period:
+            return None
+        if avg_loss == 0:
+            return 50.0 if avg_gain == 0 else 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def update(self, high, low, close, volume):
+        """إضافة شمعة مغلقة"""
+        if self.closes:
+            self.avg_gain, self.avg_loss, self.delta_count = self._wilder_step(close - self.closes[-1])
+            rsi = self._rsi(self.avg_gain, self.avg_loss, self.delta_count)
+            if rsi is not None:
+                self.rsi_window.append(rsi)
+
+        self.ema_8.push(close)
+        self.ema_21.push(close)
+        macd = self.ema_12.push(close) - self.ema_26.push(close)
+        self.macd_signal.push(macd)
+
+        self.sma_50.push(close)
+        self.volume_20.push(volume)
+        self.range_14.push(high - low)
+        self.closes.append(close)
+
+    def provisional(self, high, low, close, volume):
+        """المؤشرات كما لو أُغلقت الشمعة الحالية بهذه القيم (بدون تعديل الحالة)"""
+        rsi_window = list(self.rsi_window)
+        if self.closes:
+            rsi = self._rsi(*self._wilder_step(close - self.closes[-1]))
+            if rsi is not None:
+                rsi_window = (rsi_window + [rsi])[-self.period:]
+
+        closes = list(self.closes)[-(MIN_CANDLES - 1):] + [close]
+        macd = self.ema_12.peek(close) - self.ema_26.peek(close)
+        full_sma = len(self.sma_50.values) >= self.sma_50.values.maxlen - 1
+        return self._snapshot(
+            rsi_window, closes,
+            ema_8=self.ema_8.peek(close),
+            ema_21=self.ema_21.peek(close),
+            sma_50=self.sma_50.peek_mean(close) if full_sma else np.nan,
+            macd_histogram=macd - self.macd_signal.peek(macd),
+            volume_ratio_args=(volume, self.volume_20.peek_mean(volume)),
+            atr=self.range_14.peek_mean(high - low)
+        )
+
+    def snapshot(self):
+        """المؤشرات بعد آخر شمعة مغلقة"""
+        if not self.closes:
+            return None
+        sma = self.sma_50
+        macd = self.ema_12.value() - self.ema_26.value()
+        return self._snapshot(
+            list(self.rsi_window), self.closes,
+            ema_8=self.ema_8.value(),
+            ema_21=self.ema_21.value(),
+            sma_50=sma.total / len(sma.values) if len(sma.values) == sma.values.maxlen else np.nan,
+            macd_histogram=macd - self.macd_signal.value(),
+            volume_ratio_args=(self.volume_20.values[-1], self.volume_20.total / len(self.volume_20.values)),
+            atr=self.range_14.total / len(self.range_14.values)
+        )
+
+    def _snapshot(self, rsi_window, closes, ema_8, ema_21, sma_50, macd_histogram,
+                  volume_ratio_args, atr):
+        if len(closes) < MIN_CANDLES:
+            return None
+
+        rsi = rsi_window[-1] if rsi_window else 50.0
+        stoch_rsi = 50.0
+        if len(rsi_window) == self.period:
+            min_rsi, max_rsi = min(rsi_window), max(rsi_window)
+            if max_rsi != min_rsi:
+                stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi) * 100
+
+        current_volume, volume_avg = volume_ratio_args
+        current = closes[-1]
+        return {
+            'rsi': rsi,
+            'stoch_rsi': stoch_rsi,
+            'ema_8': ema_8,
+            'ema_21': ema_21,
+            'sma_50': sma_50,
+            'macd_histogram': macd_histogram,
+            'volume_ratio': current_volume / volume_avg if volume_avg > 0 else 1,
+            'volatility': atr / current * 100,
+            'price_change_5m': (current - closes[-2]) / closes[-2] * 100,
+            'price_change_1h': (current - closes[-12]) / closes[-12] * 100,
+            'price_change_4h': (current - closes[-48]) / closes[-48] * 100,
+        }
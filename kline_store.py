@@ -0,0 +1,162 @@
+"""مخزن شموع على القرص: ملف عمود مستقل (float64) لكل عملة وفاصل زمني
+
+    <root>/<interval>/<SYMBOL>/open_time.f64, open.f64, high.f64, low.f64, close.f64, volume.f64
+
+الملفات للإضافة فقط (شموع مغلقة بترتيب زمني)، لذا عمود open_time المرتب هو
+الفهرس الزمني: البحث عن نطاق زمني بحث ثنائي على الملف المربوط بالذاكرة.
+القراءة ترجع شرائح memmap بدون نسخ أو تحميل الملف كاملاً.
+
+    python kline_store.py --data-dir data --days 730 --symbols BTCUSDT ETHUSDT
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from exchange_client import BinanceClient, BINANCE_API_URL, INTERVAL_MS, KLINE_COLUMNS, OPEN_TIME
+
+COLUMN_NAMES = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+ITEM_SIZE = np.dtype(np.float64).itemsize
+
+
+class KlineStore:
+    """قراءة وإضافة الشموع المحفوظة على القرص"""
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.locks = {}
+        self.mapped = {}  # (symbol, interval) -> (عدد الشموع، أعمدة memmap)
+
+    def _folder(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol)
+
+    def _paths(self, symbol, interval):
+        folder = self._folder(symbol, interval)
+        return [os.path.join(folder, f"{name}.f64") for name in COLUMN_NAMES]
+
+    def _lock(self, key):
+        with self.lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def _stored_length(self, paths):
+        """عدد الشموع الكاملة (أقصر عمود، في حال انقطاع كتابة سابقة)"""
+        if not all(os.path.exists(path) for path in paths):
+            return 0
+        return min(os.path.getsize(path) for path in paths) // ITEM_SIZE
+
+    def symbols(self, interval):
+        """جميع العملات المحفوظة لهذا الفاصل الزمني"""
+        folder = os.path.join(self.root, interval)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name)))
+
+    def columns(self, symbol, interval):
+        """جميع الأعمدة كقائمة memmap (تُفهرس بـ OPEN_TIME ... VOLUME)"""
+        key = (symbol, interval)
+        paths = self._paths(symbol, interval)
+        length = self._stored_length(paths)
+
+        cached = self.mapped.get(key)
+        if cached and cached[0] == length:
+            return cached[1]
+
+        if length == 0:
+            columns = [np.empty(0, dtype=np.float64) for _ in range(KLINE_COLUMNS)]
+        else:
+            columns = [np.memmap(path, dtype=np.float64, mode='r', shape=(length,)) for path in paths]
+        self.mapped[key] = (length, columns)
+        return columns
+
+    def length(self, symbol, interval):
+        return self._stored_length(self._paths(symbol, interval))
+
+    def last_open_time(self, symbol, interval):
+        """وقت فتح آخر شمعة محفوظة (أو None)"""
+        open_times = self.columns(symbol, interval)[OPEN_TIME]
+        return float(open_times[-1]) if len(open_times) else None
+
+    def read(self, symbol, interval, start=None, end=None):
+        """الشموع في النطاق [start, end) بالميلي ثانية كشرائح بدون نسخ"""
+        columns = self.columns(symbol, interval)
+        open_times = columns[OPEN_TIME]
+        first = 0 if start is None else int(np.searchsorted(open_times, start, side='left'))
+        last = len(open_times) if end is None else int(np.searchsorted(open_times, end, side='left'))
+        return [column[first:last] for column in columns]
+
+    def tail(self, symbol, interval, count):
+        """آخر count شمعة"""
+        columns = self.columns(symbol, interval)
+        return [column[-count:] if count else column[:0] for column in columns]
+
+    def append(self, symbol, interval, rows, allow_gap=False):
+        """إضافة شموع مغلقة (n × 6)؛ الشموع غير الأحدث من آخر شمعة محفوظة تُتجاهل
+
+        أول شمعة جديدة يجب أن تلي آخر شمعة محفوظة مباشرة (وإلا ValueError)، حتى
+        لا يصبح التاريخ متقطعاً بصمت. allow_gap للصفحات المتصلة من المنصة نفسها
+        (فجواتها فجوات حقيقية في التداول).
+        """
+        if not len(rows):
+            return 0
+        key = (symbol, interval)
+        with self._lock(key):
+            paths = self._paths(symbol, interval)
+            length = self._stored_length(paths)
+            os.makedirs(self._folder(symbol, interval), exist_ok=True)
+
+            if length:
+                last = self.columns(symbol, interval)[OPEN_TIME][-1]
+                rows = rows[rows[:, OPEN_TIME] > last]
+                if not len(rows):
+                    return 0
+                if not allow_gap and rows[0, OPEN_TIME] != last + INTERVAL_MS[interval]:
+                    raise ValueError(f"{symbol} {interval}: gap between stored candle {int(last)} "
+                                     f"and appended candle {int(rows[0, OPEN_TIME])}")
+
+            for column, path in enumerate(paths):
+                with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                    f.truncate(length * ITEM_SIZE)  # إزالة بقايا كتابة غير مكتملة
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(rows[:, column], dtype=np.float64).tobytes())
+            return len(rows)
+
+
+def closed_rows(rows, interval, now_ms=None):
+    """الشموع المغلقة فقط (وقت إغلاقها مضى)"""
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+    return rows[rows[:, OPEN_TIME] + INTERVAL_MS[interval] <= now_ms]
+
+
+def backfill(client, store, symbol, interval, start_ms):
+    """تنزيل الشموع التاريخية من start_ms (أو من آخر شمعة محفوظة) حتى الآن"""
+    last = store.last_open_time(symbol, interval)
+    cursor = int(last + INTERVAL_MS[interval]) if last is not None else int(start_ms)
+    added = 0
+    for rows in client.klines_since(symbol, interval, cursor):
+        added += store.append(symbol, interval, closed_rows(rows, interval), allow_gap=True)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', required=True)
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--interval', default='5m')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--base-url', default=BINANCE_API_URL)
+    args = parser.parse_args()
+
+    client = BinanceClient(args.base_url)
+    store = KlineStore(args.data_dir)
+    start_ms = (time.time() - args.days * 86400) * 1000
+
+    for symbol in args.symbols:
+        added = backfill(client, store, symbol, args.interval, start_ms)
+        print(f"✅ {symbol}: +{added} شمعة (المجموع {store.length(symbol, args.interval)})")
+
+
+if __name__ == '__main__':
+    main()
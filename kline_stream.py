@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+BINANCE_WS_URL = "wss://stream.binance.com:9443"
+
+# Binance يسمح بـ 1024 بث لكل اتصال، نستخدم أقل من ذلك لتوزيع الحمل
+STREAMS_PER_CONNECTION = 200
+
+
+class KlineStreamer:
+    """استقبال شموع Binance عبر اتصالات WebSocket مجمّعة (combined streams)
+
+    on_kline(symbol, kline) تُستدعى لكل تحديث شمعة (k من رسالة kline)،
+    و on_connect(symbols) تُستدعى بعد كل اشتراك (بما فيه الأول) لسد الفجوة عبر REST.
+    """
+
+    def __init__(self, symbols, interval, on_kline, on_connect=None,
+                 url=BINANCE_WS_URL, streams_per_connection=STREAMS_PER_CONNECTION):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.on_kline = on_kline
+        self.on_connect = on_connect
+        self.url = url.rstrip('/')
+        self.streams_per_connection = streams_per_connection
+        self.max_backoff = 60
+        self._stopped = None
+        self._loop = None
+
+    async def run(self):
+        """تشغيل جميع الاتصالات حتى استدعاء stop()"""
+        self._stopped = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        chunks = [
+            self.symbols[i:i + self.streams_per_connection]
+            for i in range(0, len(self.symbols), self.streams_per_connection)
+        ]
+        await asyncio.gather(*(self._run_connection(chunk) for chunk in chunks))
+
+    def stop(self):
+        """إيقاف البث (آمن من أي خيط)"""
+        if self._stopped is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def _run_connection(self, symbols):
+        """اتصال واحد مع إعادة اتصال تلقائية وتأخير أُسّي"""
+        try:
+            import websockets
+        except ImportError:
+            raise RuntimeError("Streaming mode requires the 'websockets' package") from None
+
+        streams = [f"{symbol.lower()}@kline_{self.interval}" for symbol in symbols]
+        backoff = 1
+        loop = asyncio.get_running_loop()
+
+        while not self._stopped.is_set():
+            try:
+                async with websockets.connect(f"{self.url}/stream", ping_interval=20) as ws:
+                    await ws.send(json.dumps({'method': 'SUBSCRIBE', 'params': streams, 'id': 1}))
+
+                    # سد الفجوة بعد الاشتراك حتى لا تضيع أي شمعة بين الاثنين
+                    # (في الاتصال الأول أيضاً: ما أُغلق منذ التحميل الأولي)
+                    if self.on_connect:
+                        await loop.run_in_executor(None, self.on_connect, symbols)
+                    backoff = 1
+
+                    receiver = asyncio.ensure_future(self._receive(ws))
+                    stopper = asyncio.ensure_future(self._stopped.wait())
+                    done, pending = await asyncio.wait(
+                        {receiver, stopper}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in pending:
+                        task.cancel()
+                    if receiver in done:
+                        receiver.result()
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                print(f"\n⚠️ انقطع اتصال البث ({len(symbols)} عملة): {e} - إعادة المحاولة خلال {backoff} ث")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _receive(self, ws):
+        async for message in ws:
+            payload = json.loads(message)
+            data = payload.get('data')
+            if not data or data.get('e') != 'kline':
+                continue  # رد الاشتراك أو رسائل أخرى
+            self.on_kline(data['s'], data['k'])
+        raise ConnectionError("stream closed by server")
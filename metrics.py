@@ -0,0 +1,259 @@
+"""قياسات داخلية للبوت: مدد المراحل، عدادات الأخطاء، وزن API، ومدة الدورة
+
+تُعرض بصيغة Prometheus النصية عبر خادم HTTP صغير:
+
+    GET /metrics                                   جميع القياسات
+    GET /profile/start?mode=cprofile|sample        تشغيل التحليل الزمني
+    GET /profile/stop                              إيقافه وإرجاع التقرير
+"""
+import bisect
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# حدود المدد بالثواني (من 1ms حتى دقيقتين)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    """توزيع قيم على حدود ثابتة (عدد القيم في كل حد + المجموع)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # الأخير: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+class Metrics:
+    """سجل القياسات (آمن للخيوط): histograms و counters و gauges بتسميات اختيارية"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        """وصف القياس في سطر # HELP"""
+        self.help[name] = text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """قياس مدة الكتلة بالثواني في histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name, **labels):
+        """قيمة عداد أو مؤشر (للعرض داخل البوت)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            return self.counters.get(key, self.gauges.get(key, 0))
+
+    def render(self):
+        """جميع القياسات بصيغة Prometheus النصية"""
+        with self.lock:
+            histograms = [(key, list(h.counts), h.sum, h.count, h.buckets) for key, h in self.histograms.items()]
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters):
+            declare(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges):
+            declare(name, 'gauge')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), counts, total, count, buckets in sorted(histograms, key=lambda h: h[0]):
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+class Profiler:
+    """تحليل زمني يُشغَّل ويُوقف أثناء العمل
+
+    cprofile: cProfile على خيط الدورة (يُفعَّل داخل cycle() في بداية كل دورة)
+    sample: خيط يأخذ عينات من مكدسات جميع الخيوط (بما فيها خيوط الجلب) بكلفة منخفضة
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.mode = None
+        self.profile = None
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, mode='cprofile', interval=0.005):
+        with self.lock:
+            if self.mode:
+                raise RuntimeError(f"profiler already running ({self.mode})")
+            if mode == 'cprofile':
+                self.profile = cProfile.Profile()
+            elif mode == 'sample':
+                self.samples = Counter()
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._sample, args=(interval,),
+                                                name='profiler', daemon=True)
+                self._thread.start()
+            else:
+                raise ValueError(f"unknown profiler mode {mode!r}")
+            self.mode = mode
+
+    def _sample(self, interval):
+        own = threading.get_ident()
+        while not self._stop.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_code.co_name}")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    @contextmanager
+    def cycle(self):
+        """تغليف دورة التحليل (يعمل فقط في وضع cprofile)"""
+        profile = self.profile if self.mode == 'cprofile' else None
+        if profile is None:
+            yield
+            return
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def stop(self, limit=40):
+        """إيقاف التحليل وإرجاع التقرير نصاً"""
+        with self.lock:
+            mode, self.mode = self.mode, None
+            if mode == 'cprofile':
+                output = io.StringIO()
+                try:
+                    pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(limit)
+                except TypeError:
+                    output.write("no profiled cycles yet\n")
+                self.profile = None
+                return output.getvalue()
+            if mode == 'sample':
+                self._stop.set()
+                self._thread.join()
+                # صيغة المكدسات المطوية (تصلح مباشرة لأدوات flame graph)
+                return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+            return "profiler not running\n"
+
+
+class MetricsServer:
+    """خادم HTTP في الخلفية يعرض القياسات ويتحكم بالتحليل الزمني"""
+
+    def __init__(self, metrics, profiler=None, port=9100, host='127.0.0.1'):
+        self.metrics = metrics
+        self.profiler = profiler
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True)
+
+    def _handler(self):
+        metrics, profiler = self.metrics, self.profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, text, content_type='text/plain; version=0.0.4'):
+                body = text.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path == '/metrics':
+                    return self.reply(200, metrics.render())
+                if profiler is None or not url.path.startswith('/profile'):
+                    return self.reply(404, "not found\n")
+                try:
+                    if url.path == '/profile/start':
+                        interval = float(query.get('interval_ms', 5)) / 1000
+                        profiler.start(query.get('mode', 'cprofile'), interval)
+                        return self.reply(200, f"profiling started ({profiler.mode})\n")
+                    if url.path == '/profile/stop':
+                        return self.reply(200, profiler.stop())
+                    return self.reply(200, f"profiler: {profiler.mode or 'off'}\n")
+                except (RuntimeError, ValueError) as e:
+                    return self.reply(400, f"{e}\n")
+
+        return Handler
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,79 @@
+"""جدولة التحليل على حدود إغلاق الشموع مع أولوية للعملات
+
+الفحص الكامل يبدأ بعد إغلاق كل شمعة بثوانٍ قليلة (حتى تكتمل الشمعة لدى
+المنصة)، وبين الإغلاقات يُعاد فحص العملات "الساخنة" فقط: القريبة من حد
+الإشارة أو الأعلى تقلباً. كل دورة لها مهلة: العملات الأقل أولوية التي لم
+يتسع لها الوقت تُؤجل (وترتفع أولويتها في الدورة التالية) بدل تأخير كل شيء.
+"""
+import time
+
+import numpy as np
+
+from exchange_client import INTERVAL_MS, top_n_indices
+
+
+def next_boundary(interval, now=None):
+    """وقت (ثوانٍ منذ epoch) إغلاق الشمعة الحالية لهذا الفاصل"""
+    now = time.time() if now is None else now
+    step = INTERVAL_MS[interval] / 1000
+    return (now // step + 1) * step
+
+
+class CandleScheduler:
+    """مواعيد الفحص الكامل والفحص السريع وترتيب العملات حسب الأولوية"""
+
+    def __init__(self, interval='5m', settle=2.0, recheck=60.0, hot_count=20, deadline_ratio=0.8,
+                 volatility_weight=0.5, staleness_weight=0.25):
+        self.interval = interval
+        self.settle = settle                    # ثوانٍ بعد الإغلاق قبل الفحص
+        self.recheck = recheck                  # ثوانٍ بين فحوص العملات الساخنة (0 لتعطيلها)
+        self.hot_count = hot_count
+        self.deadline_ratio = deadline_ratio    # نسبة الفاصل المسموحة لكل دورة
+        self.volatility_weight = volatility_weight
+        self.staleness_weight = staleness_weight
+
+    @property
+    def period(self):
+        return INTERVAL_MS[self.interval] / 1000
+
+    def next_full_scan(self, now=None):
+        return next_boundary(self.interval, now) + self.settle
+
+    def full_scan_deadline(self, started):
+        return started + self.period * self.deadline_ratio
+
+    def hot_scan_deadline(self, started):
+        return started + self.recheck * self.deadline_ratio
+
+    def closing_intervals(self, intervals, boundary):
+        """الفواصل التي تُغلق شمعتها عند هذا الحد (مثلاً 1h تُفحص فقط عند رأس الساعة)"""
+        boundary_ms = round(boundary * 1000)
+        return [interval for interval in intervals if boundary_ms % INTERVAL_MS[interval] == 0]
+
+    def priorities(self, symbols, scores, volatility, last_seen, cycle, min_points):
+        """أولوية كل عملة: القرب من حد الإشارة + التقلب النسبي + عدد الدورات منذ آخر فحص
+
+        العملات التي لم تُفحص بعد تأخذ أعلى أولوية.
+        """
+        score = np.array([scores.get(symbol, np.nan) for symbol in symbols], dtype=np.float64)
+        vol = np.array([volatility.get(symbol, np.nan) for symbol in symbols], dtype=np.float64)
+        stale = np.array([cycle - last_seen.get(symbol, cycle) for symbol in symbols], dtype=np.float64)
+
+        proximity = np.clip(score / min_points, 0, 1)
+        median = np.nanmedian(vol) if np.isfinite(vol).any() else 0.0
+        relative_vol = np.clip(vol / median, 0, 3) / 3 if median > 0 else np.zeros_like(vol)
+
+        priority = proximity + self.volatility_weight * relative_vol + self.staleness_weight * stale
+        return np.where(np.isnan(priority), np.inf, priority)
+
+    def order(self, symbols, priority):
+        """العملات مرتبة من الأعلى أولوية"""
+        return [symbols[i] for i in np.argsort(-priority, kind='stable')]
+
+    def hot_symbols(self, symbols, priority):
+        """أعلى hot_count عملة (سبق فحصها) لإعادة الفحص بين الإغلاقات"""
+        known = np.flatnonzero(np.isfinite(priority))
+        if not len(known):
+            return []
+        top = top_n_indices(priority[known], self.hot_count)
+        return [symbols[i] for i in known[top]]
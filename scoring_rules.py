@@ -0,0 +1,119 @@
+"""جدول قواعد النقاط: يُحمَّل من JSON (أو YAML) ويُترجم إلى أقنعة NumPy
+
+كل قاعدة: indicator op value → points. القيمة رقم أو اسم مؤشر آخر (مع
+factor اختياري)، و op واحدة من < <= > >= between. القواعد التي تشترك في
+group متنافية: أول قاعدة متحققة بالترتيب تأخذ النقاط (مثل if/elif)، و
+requires تشترط تحقق قاعدة سابقة. المؤشرات على فواصل أعلى تُكتب بلاحقة الفاصل
+(rsi_1h, ema_8_4h ...) ويحسبها البوت تلقائياً من الشموع المخزنة.
+"""
+import json
+import os
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_rules.json')
+
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    'between': lambda values, bounds: np.greater(values, bounds[0]) & np.less(values, bounds[1]),
+}
+
+
+class ScoringRules:
+    """قواعد النقاط بعد الترجمة، تُقيّم مصفوفة مؤشرات كاملة دفعة واحدة"""
+
+    def __init__(self, config):
+        self.min_points = config['min_points']
+        self.levels = sorted(config['levels'], key=lambda level: level['min_points'], reverse=True)
+        if not self.levels or self.levels[-1]['min_points'] > self.min_points:
+            # كل نقاط تتجاوز الحد الأدنى يجب أن تقع في مستوى
+            raise ValueError(f"levels must include one with min_points <= {self.min_points}")
+        self.rules = []
+
+        seen = set()
+        for rule in config['rules']:
+            if rule['op'] not in OPERATORS:
+                raise ValueError(f"rule {rule['id']}: unknown operator {rule['op']!r}")
+            if rule.get('requires') and rule['requires'] not in seen:
+                raise ValueError(f"rule {rule['id']}: requires unknown or later rule {rule['requires']!r}")
+            seen.add(rule['id'])
+            self.rules.append(rule)
+
+        # أقصى مجموع: أعلى قاعدة في كل مجموعة + القواعد المستقلة
+        best = {}
+        for rule in self.rules:
+            group = rule.get('group', rule['id'])
+            best[group] = max(best.get(group, 0), rule['points'])
+        self.max_points = sum(best.values())
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_PATH):
+        """تحميل القواعد من ملف JSON أو YAML"""
+        with open(path, encoding='utf-8') as f:
+            if path.endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise RuntimeError("YAML rule files require the 'PyYAML' package") from None
+                return cls(yaml.safe_load(f))
+            return cls(json.load(f))
+
+    def indicator_names(self):
+        """أسماء جميع المؤشرات التي تستخدمها القواعد"""
+        names = set()
+        for rule in self.rules:
+            names.add(rule['indicator'])
+            if isinstance(rule['value'], str):
+                names.add(rule['value'])
+        return names
+
+    def thresholds(self):
+        """حدود المستويات تصاعدياً (مثلاً 65, 75, 85)"""
+        return tuple(level['min_points'] for level in reversed(self.levels))
+
+    def _operand(self, rule, indicators):
+        value = rule['value']
+        if isinstance(value, str):
+            value = indicators[value]
+        return value * rule['factor'] if 'factor' in rule else value
+
+    def evaluate(self, indicators):
+        """النقاط وقناع كل قاعدة لجميع العناصر (عملات أو شموع) في تمريرة واحدة"""
+        points = 0
+        masks = {}
+        taken = {}
+
+        for rule in self.rules:
+            mask = OPERATORS[rule['op']](indicators[rule['indicator']], self._operand(rule, indicators))
+            if rule.get('requires'):
+                mask = mask & masks[rule['requires']]
+            group = rule.get('group')
+            if group:
+                if group in taken:
+                    mask = mask & ~taken[group]
+                    taken[group] = taken[group] | mask
+                else:
+                    taken[group] = mask
+            masks[rule['id']] = mask
+            points = points + np.where(mask, rule['points'], 0)
+
+        return points, masks
+
+    def score(self, indicators):
+        return self.evaluate(indicators)[0]
+
+    def conditions(self, masks, index=()):
+        """نصوص الشروط المتحققة لعنصر واحد (تُبنى فقط للعناصر التي تجاوزت الحد)"""
+        return [rule['text'] for rule in self.rules if masks[rule['id']][index]]
+
+    def classify(self, points):
+        """(نص الإشارة، مستوى التنبيه) أو None إذا كانت النقاط أقل من الحد الأدنى"""
+        if points < self.min_points:
+            return None
+        for level in self.levels:
+            if points >= level['min_points']:
+                return level['signal'], level['alert_level']
+        return None
@@ -0,0 +1,98 @@
+"""فرز السوق كاملاً على مرحلتين: فلتر رخيص من ticker/24hr ثم تحليل عميق للمرشحين فقط
+
+المرحلة الأولى طلب واحد لكل السوق (وزن 80) وتُقيَّم متجهياً:
+- التغير خلال 24 ساعة (priceChangePercent)
+- قفزة الحجم منذ اللقطة السابقة: الحجم المضاف تقديرياً مقسوماً على متوسطه
+  لنفس المدة خلال 24 ساعة (حجم 24 ساعة متحرك، فالجزء الخارج منه يُقدَّر بالمتوسط)
+- فرق الشراء/البيع (spread) والسيولة الدنيا
+
+العملة تجتاز إذا كانت سيولتها وفرقها مقبولين وتحقق التغير أو قفزة الحجم،
+ويُحدد عدد المرشحين بـ max_candidates (الأقوى أولاً) حتى تبقى كلفة المرحلة
+الثانية قريبة من فحص 50 عملة.
+"""
+import time
+
+import numpy as np
+
+from exchange_client import top_n_indices
+
+DAY_SECONDS = 86400
+
+
+def parse_ticker_snapshot(tickers, allowed_symbols=None):
+    """(الرموز، مصفوفة أعمدة: التغير%، حجم USDT، أفضل شراء، أفضل بيع) من ticker/24hr"""
+    allowed = set(allowed_symbols) if allowed_symbols is not None else None
+    rows = [
+        ticker for ticker in tickers
+        if allowed is None or ticker['symbol'] in allowed
+    ]
+    symbols = np.array([ticker['symbol'] for ticker in rows], dtype=object)
+    values = np.array([
+        (ticker.get('priceChangePercent', 0), ticker.get('quoteVolume', 0),
+         ticker.get('bidPrice', 0), ticker.get('askPrice', 0))
+        for ticker in rows
+    ], dtype=np.float64).reshape(-1, 4)
+    return symbols, values.T
+
+
+class TickerPrefilter:
+    """المرحلة الأولى: فلتر متجه على بيانات ticker لكل السوق"""
+
+    def __init__(self, min_change_pct=2.0, min_volume_spike=2.0, max_spread_pct=0.15,
+                 min_quote_volume=1_000_000, max_candidates=50):
+        self.min_change_pct = min_change_pct
+        self.min_volume_spike = min_volume_spike
+        self.max_spread_pct = max_spread_pct
+        self.min_quote_volume = min_quote_volume
+        self.max_candidates = max_candidates
+        self.previous = None  # (الوقت، الرموز مرتبة، حجم كل رمز)
+
+    def volume_spike(self, symbols, quote_volume, now):
+        """نسبة الحجم المضاف منذ اللقطة السابقة إلى متوسطه لنفس المدة (NaN بدون لقطة سابقة)"""
+        spike = np.full(len(symbols), np.nan)
+        if self.previous is not None:
+            previous_time, previous_symbols, previous_volume = self.previous
+            elapsed = now - previous_time
+            if elapsed > 0 and len(previous_symbols):
+                position = np.minimum(np.searchsorted(previous_symbols, symbols), len(previous_symbols) - 1)
+                found = previous_symbols[position] == symbols
+                before = np.where(found, previous_volume[position], np.nan)
+                expected = before * elapsed / DAY_SECONDS
+                # الحجم المتحرك: الجديد = السابق + المضاف - الخارج (≈ المتوسط)
+                added = quote_volume - before + expected
+                spike = np.where(expected > 0, added / np.where(expected > 0, expected, 1.0), np.nan)
+
+        order = np.argsort(symbols)
+        self.previous = (now, symbols[order], quote_volume[order])
+        return spike
+
+    def screen(self, tickers, allowed_symbols=None, now=None):
+        """(المرشحون مرتبين من الأقوى، إحصائيات كل شرط)"""
+        now = time.time() if now is None else now
+        symbols, (change, quote_volume, bid, ask) = parse_ticker_snapshot(tickers, allowed_symbols)
+        spike = self.volume_spike(symbols, quote_volume, now)
+
+        mid = (bid + ask) / 2
+        spread = np.where(mid > 0, (ask - bid) / np.where(mid > 0, mid, 1.0) * 100, np.inf)
+
+        liquid = quote_volume >= self.min_quote_volume
+        tight = spread <= self.max_spread_pct
+        moving = np.abs(change) >= self.min_change_pct
+        spiking = spike >= self.min_volume_spike  # NaN (أول لقطة) ← False
+        passed = liquid & tight & (moving | spiking)
+
+        # ترتيب المجتازين حسب قوة الحركة وتحديد العدد
+        strength = np.abs(change) / self.min_change_pct + np.nan_to_num(spike) / self.min_volume_spike
+        candidates = np.flatnonzero(passed)
+        candidates = candidates[top_n_indices(strength[candidates], self.max_candidates)]
+
+        stats = {
+            'universe': len(symbols),
+            'liquid': int(liquid.sum()),
+            'tight_spread': int((liquid & tight).sum()),
+            'moving': int((liquid & tight & moving).sum()),
+            'volume_spike': int((liquid & tight & spiking).sum()),
+            'passed': int(passed.sum()),
+            'candidates': len(candidates),
+        }
+        return symbols[candidates].tolist(), stats
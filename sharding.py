@@ -0,0 +1,120 @@
+"""توزيع العملات على عدة عمليات أو عدة نسخ من البوت
+
+كل عملة تُنسب إلى جزء ثابت عبر crc32، فتبقى العملة نفسها دائماً عند نفس
+العامل ويحتفظ بمخزن شموعها وحالتها بين الدورات.
+"""
+import multiprocessing
+import queue
+import time
+import zlib
+
+
+def shard_of(symbol, shard_count, salt=''):
+    """رقم الجزء الثابت للعملة"""
+    return zlib.crc32(f"{salt}{symbol}".encode()) % shard_count
+
+
+def partition(symbols, shard_count, salt=''):
+    """تقسيم العملات إلى shard_count قائمة"""
+    shards = [[] for _ in range(shard_count)]
+    for symbol in symbols:
+        shards[shard_of(symbol, shard_count, salt)].append(symbol)
+    return shards
+
+
+def _worker_main(worker_index, bot_options, weight_limit, tasks, results):
+    """عملية عامل: نسخة بوت مستقلة (اتصالات ومخزن شموع خاص) تحلل ما يصلها من عملات"""
+    from advanced_bot import AdvancedTradingBot
+
+    # الفواصل والفواصل الأعلى تحدد حجم مخزن الشموع، فتُضبط كما في المنسق
+    intervals = bot_options.pop('intervals', None)
+    timeframes = bot_options.pop('timeframes', ())
+    bot = AdvancedTradingBot(load_symbols=False, **bot_options)
+    bot.client.rate_limiter.set_limit(weight_limit)
+    if intervals:
+        bot.intervals = list(intervals)
+    bot.set_timeframes(timeframes)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        cycle_id, symbols, intervals, analysis_count, closed_only = task
+        bot.analysis_count = analysis_count
+        signals, scores, error = [], {}, None
+        try:
+            signals = bot.analyze_symbols(symbols, intervals, closed_only)
+            # نقاط وتقلب ما فُحص في هذه الدورة (لأولويات الجدولة عند المنسق)
+            scores = {
+                symbol: (bot.last_scores[symbol], bot.last_volatility[symbol])
+                for symbol in symbols if bot.last_seen.get(symbol) == analysis_count
+            }
+        except Exception as e:
+            # يُعاد الخطأ إلى المنسق ليُحتسب في قياساته بدل ضياعه داخل العملية
+            error = (type(e).__name__, str(e))
+        results.put((cycle_id, worker_index, len(symbols), signals, scores, error))
+
+    bot.client.close()
+
+
+class ShardWorkerPool:
+    """مجموعة عمليات دائمة، لكل عملية جزء ثابت من العملات"""
+
+    # ملح مختلف عن تقسيم النسخ (--shard-index) حتى لا يتطابق التوزيعان
+    SALT = 'worker:'
+
+    def __init__(self, workers, bot_options, weight_limit):
+        context = multiprocessing.get_context('spawn')
+        self.workers = workers
+        self.results = context.Queue()
+        self.tasks = [context.Queue() for _ in range(workers)]
+        self.processes = [
+            context.Process(
+                target=_worker_main, name=f'shard-{index}', daemon=True,
+                args=(index, bot_options, weight_limit / workers, self.tasks[index], self.results)
+            )
+            for index in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+        self.cycle_id = 0
+
+    def run_cycle(self, symbols, intervals, analysis_count, timeout=None, closed_only=False):
+        """تحليل جميع العملات موزعة على العمال
+
+        ترجع (الإشارات، عدد العملات لكل عامل، {العملة: (النقاط، التقلب)}،
+        {رقم العامل: (نوع الخطأ، نصه)} للعمال الذين فشلت دورتهم).
+        timeout مهلة الدورة كلها وليس كل عامل على حدة.
+        """
+        self.cycle_id += 1
+        deadline = time.time() + timeout if timeout is not None else None
+        shards = partition(symbols, self.workers, self.SALT)
+        for index, shard in enumerate(shards):
+            self.tasks[index].put((self.cycle_id, shard, list(intervals), analysis_count, closed_only))
+
+        signals = []
+        per_worker = {}
+        scores = {}
+        errors = {}
+        while len(per_worker) < self.workers:
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.time())
+                cycle_id, index, count, worker_signals, worker_scores, error = self.results.get(timeout=remaining)
+            except queue.Empty:
+                print(f"⚠️ لم تصل نتائج {self.workers - len(per_worker)} عامل قبل انتهاء المهلة")
+                break
+            if cycle_id != self.cycle_id:
+                continue  # نتيجة متأخرة من دورة سابقة
+            per_worker[index] = count
+            signals.extend(worker_signals)
+            scores.update(worker_scores)
+            if error:
+                errors[index] = error
+
+        return signals, per_worker, scores, errors
+
+    def close(self):
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
@@ -0,0 +1,203 @@
+"""سجل الإشارات الدائم (SQLite بوضع WAL)
+
+الكتابة في خيط خلفي: كل دورة تضيف إشاراتها إلى طابور وتكمل فوراً، والخيط
+يكتب ما تجمّع في معاملة واحدة. الفهارس على (symbol, ts) و (alert_level, ts)
+و ts تجعل استعلامات "آخر N إشارة قوية" أو "إشارات عملة في فترة" بحثاً في
+الفهرس بدل مسح الجدول.
+
+    python signal_store.py --db signals.db --level HIGH --limit 20
+    python signal_store.py --db signals.db --symbol BTCUSDT --hours 24
+"""
+import argparse
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    alert_level TEXT NOT NULL,
+    confidence INTEGER NOT NULL,
+    price REAL,
+    rsi REAL,
+    stoch_rsi REAL,
+    volume_ratio REAL,
+    price_change_5m REAL,
+    price_change_1h REAL,
+    conditions TEXT,
+    analysis_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS signals_ts ON signals (ts);
+CREATE INDEX IF NOT EXISTS signals_symbol_ts ON signals (symbol, ts);
+CREATE INDEX IF NOT EXISTS signals_level_ts ON signals (alert_level, ts);
+"""
+
+COLUMNS = ('ts', 'symbol', 'interval', 'signal', 'alert_level', 'confidence', 'price', 'rsi', 'stoch_rsi',
+           'volume_ratio', 'price_change_5m', 'price_change_1h', 'conditions', 'analysis_id')
+
+INSERT = f"INSERT INTO signals ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+def _to_row(signal):
+    return (
+        signal['timestamp'].timestamp(), signal['symbol'], signal.get('interval', '5m'), signal['signal'],
+        signal['alert_level'], signal['confidence'], signal['price'], signal['rsi'], signal['stoch_rsi'],
+        signal['volume_ratio'], signal['price_change_5m'], signal['price_change_1h'],
+        json.dumps(signal['conditions'], ensure_ascii=False), signal.get('analysis_id')
+    )
+
+
+def _from_row(row):
+    signal = dict(zip(COLUMNS, row))
+    signal['timestamp'] = datetime.fromtimestamp(signal.pop('ts'))
+    signal['conditions'] = json.loads(signal['conditions'])
+    return signal
+
+
+class SignalStore:
+    """حفظ الإشارات على القرص والاستعلام عنها"""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = _connect(path)
+        self.writer.executescript(SCHEMA)
+        self.writer.commit()
+
+        # اتصال قراءة مستقل: WAL يسمح بالقراءة أثناء الكتابة
+        self.reader = _connect(path)
+        self.read_lock = threading.Lock()
+
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop, name='signal-store', daemon=True)
+        self.thread.start()
+
+    def add(self, signals):
+        """إضافة إشارات دورة (بدون انتظار الكتابة ولا حتى التحويل إلى صفوف)"""
+        if signals:
+            self.pending.put(list(signals))
+
+    def _write_loop(self):
+        while True:
+            batch = self.pending.get()
+            batches = [batch]
+            # دمج كل ما تراكم في معاملة واحدة
+            while True:
+                try:
+                    batches.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batches
+            signals = [signal for batch in batches if batch for signal in batch]
+            try:
+                rows = []
+                for signal in signals:
+                    try:
+                        rows.append(_to_row(signal))
+                    except Exception as e:
+                        symbol = signal.get('symbol') if isinstance(signal, dict) else signal
+                        print(f"❌ إشارة غير صالحة لم تُحفظ ({symbol}): {e!r}")
+                if rows:
+                    with self.writer:
+                        self.writer.executemany(INSERT, rows)
+            except Exception as e:
+                # الخيط يبقى يعمل حتى لا تتراكم الإضافات ولا يتوقف flush() إلى الأبد
+                print(f"❌ تعذر حفظ {len(rows)} إشارة: {e}")
+            finally:
+                for _ in batches:
+                    self.pending.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """انتظار كتابة كل الإشارات المضافة"""
+        self.pending.join()
+
+    def query(self, symbol=None, alert_levels=None, min_confidence=None, start=None, end=None, limit=100):
+        """الإشارات الأحدث أولاً مع مرشحات اختيارية (start/end: datetime)"""
+        clauses, params = [], []
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol)
+        if alert_levels:
+            clauses.append(f"alert_level IN ({', '.join('?' * len(alert_levels))})")
+            params.extend(alert_levels)
+        if min_confidence is not None:
+            clauses.append('confidence >= ?')
+            params.append(min_confidence)
+        if start is not None:
+            clauses.append('ts >= ?')
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append('ts < ?')
+            params.append(end.timestamp())
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM signals"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY ts DESC LIMIT ?'
+        params.append(limit)
+
+        with self.read_lock:
+            rows = self.reader.execute(sql, params).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def latest(self, limit=10, alert_levels=None):
+        """آخر N إشارة (مثلاً latest(20, ['HIGH']) لآخر الإشارات القوية)"""
+        return self.query(alert_levels=alert_levels, limit=limit)
+
+    def for_symbol(self, symbol, start=None, end=None, limit=1000):
+        """إشارات عملة واحدة في فترة زمنية"""
+        return self.query(symbol=symbol, start=start, end=end, limit=limit)
+
+    def count(self):
+        with self.read_lock:
+            return self.reader.execute('SELECT COUNT(*) FROM signals').fetchone()[0]
+
+    def close(self):
+        """كتابة المتبقي ثم إغلاق الاتصالات"""
+        self.pending.put(None)
+        self.thread.join()
+        self.writer.close()
+        self.reader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--symbol')
+    parser.add_argument('--level', nargs='+', help='مستويات التنبيه (HIGH MEDIUM LOW)')
+    parser.add_argument('--min-confidence', type=int)
+    parser.add_argument('--hours', type=float, help='آخر N ساعة فقط')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    store = SignalStore(args.db)
+    start = datetime.fromtimestamp(time.time() - args.hours * 3600) if args.hours else None
+    began = time.perf_counter()
+    signals = store.query(args.symbol, args.level, args.min_confidence, start, limit=args.limit)
+    elapsed = (time.perf_counter() - began) * 1000
+
+    for signal in signals:
+        print(f"{signal['timestamp']:%Y-%m-%d %H:%M} {signal['symbol']:<12} {signal['interval']:<4} "
+              f"{signal['alert_level']:<6} {signal['confidence']:>3}% ${signal['price']:.4f}")
+    print(f"📊 {len(signals)} إشارة من {store.count()} ({elapsed:.1f} ms)")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
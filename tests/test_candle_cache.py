@@ -0,0 +1,47 @@
+import numpy as np
+
+from candle_cache import CandleRingBuffer
+from exchange_client import KLINE_COLUMNS, OPEN_TIME, CLOSE
+
+STEP = 300_000
+
+
+def candles(start, count):
+    """شموع متتالية (n × 6) إغلاقها = رقمها"""
+    rows = np.zeros((count, KLINE_COLUMNS))
+    rows[:, OPEN_TIME] = (start + np.arange(count)) * STEP
+    rows[:, CLOSE] = start + np.arange(count)
+    return rows
+
+
+def test_wraparound_keeps_last_candles_in_order():
+    buffer = CandleRingBuffer(5)
+    buffer.update(candles(0, 3))
+    buffer.update(candles(3, 4))  # يلتف حول نهاية المخزن
+    assert len(buffer) == 5
+    assert buffer.view()[CLOSE].tolist() == [2, 3, 4, 5, 6]
+    assert buffer.view(2)[CLOSE].tolist() == [5, 6]
+    assert buffer.last_open_time() == 6 * STEP
+
+    buffer.update(candles(7, 12))  # أكثر من السعة دفعة واحدة
+    assert buffer.view()[CLOSE].tolist() == [14, 15, 16, 17, 18]
+
+
+def test_same_open_time_replaces_in_place():
+    buffer = CandleRingBuffer(4)
+    buffer.update(candles(0, 6))
+    forming = candles(5, 1)
+    forming[0, CLOSE] = 99
+    buffer.update(forming)
+    assert len(buffer) == 4
+    assert buffer.view()[CLOSE].tolist() == [2, 3, 4, 99]
+
+
+def test_older_candles_are_ignored():
+    buffer = CandleRingBuffer(4)
+    buffer.update(candles(0, 4))
+    buffer.update(candles(0, 2))
+    assert buffer.view()[CLOSE].tolist() == [0, 1, 2, 3]
+
+    buffer.update(candles(2, 4))  # تداخل: 2 و 3 تُستبدل/تُتجاهل ثم 4 و 5
+    assert buffer.view()[CLOSE].tolist() == [2, 3, 4, 5]
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+
+from exchange_client import parse_klines, KLINE_COLUMNS
+
+
+def binance_rows(count):
+    """صفوف klines بصيغة Binance (12 حقلاً، الأسعار نصوص)"""
+    return [
+        [1_700_000_000_000 + i * 300_000, f"{100 + i}.5", f"{101 + i}.25", f"{99 + i}.125", f"{100 + i}.75",
+         f"{1000 + i}.0", 1_700_000_299_999 + i * 300_000, "12345.6", 42, "500.0", "50000.0", "0"]
+        for i in range(count)
+    ]
+
+
+def expected(rows):
+    return np.array([row[:KLINE_COLUMNS] for row in rows], dtype=np.float64)
+
+
+def test_bytes_fast_path():
+    rows = binance_rows(5)
+    for body in (json.dumps(rows, separators=(',', ':')).encode(), json.dumps(rows).encode()):
+        parsed = parse_klines(body)
+        assert parsed.shape == (5, KLINE_COLUMNS)
+        assert np.array_equal(parsed, expected(rows))
+
+
+def test_parsed_list_and_fallback():
+    rows = binance_rows(3)
+    assert np.array_equal(parse_klines(rows), expected(rows))
+
+    # عدد حقول غير متوقع: التفكيك العادي
+    extended = [row + ["extra"] for row in rows]
+    assert np.array_equal(parse_klines(json.dumps(extended).encode()), expected(rows))
+
+
+def test_empty_response():
+    for body in (b'[]', b'', []):
+        assert parse_klines(body).shape == (0, KLINE_COLUMNS)
@@ -0,0 +1,46 @@
+"""محرك المؤشرات مقابل المرجع المستقل بحلقات Python (benchmarks/bench_indicator_matrix.py)"""
+import numpy as np
+import pytest
+
+from advanced_bot import AdvancedTradingBot
+from bench_indicator_matrix import random_market, reference_indicators, check_parity
+from exchange_client import INTERVAL_MS
+from indicators import compute_indicator_matrix, price_change_lags, IncrementalIndicators
+
+
+@pytest.mark.parametrize('n_candles', [60, 100])
+def test_matrix_matches_reference(n_candles):
+    market = random_market(12, n_candles, seed=n_candles)
+    reference = [reference_indicators(*row) for row in zip(*market)]
+    check_parity(reference, compute_indicator_matrix(*market))
+
+
+def test_per_symbol_matches_reference():
+    closes, highs, lows, volumes = random_market(6, 100, seed=7)
+    bot = AdvancedTradingBot(load_symbols=False)
+    results = [
+        bot.calculate_advanced_indicators({'closes': closes[row], 'highs': highs[row], 'lows': lows[row],
+                                           'volumes': volumes[row], 'current_price': closes[row][-1]})
+        for row in range(len(closes))
+    ]
+    reference = [reference_indicators(*row) for row in zip(closes, highs, lows, volumes)]
+    check_parity(reference, {name: np.array([result[name] for result in results]) for name in results[0]})
+
+
+def test_incremental_matches_matrix():
+    closes, highs, lows, volumes = random_market(4, 100, seed=3)
+    matrix = compute_indicator_matrix(closes, highs, lows, volumes)
+    for row in range(len(closes)):
+        state = IncrementalIndicators.from_candles(highs[row], lows[row], closes[row], volumes[row])
+        snapshot = state.snapshot()
+        for name, value in snapshot.items():
+            assert np.isclose(value, matrix[name][row], rtol=1e-7, equal_nan=True), name
+
+
+def test_price_change_lags():
+    assert price_change_lags(INTERVAL_MS['5m']) == {
+        'price_change_5m': 1, 'price_change_1h': 11, 'price_change_4h': 47}
+    assert price_change_lags(INTERVAL_MS['1m']) == {
+        'price_change_5m': 5, 'price_change_1h': 60, 'price_change_4h': 240}
+    assert price_change_lags(INTERVAL_MS['1h']) == {
+        'price_change_5m': None, 'price_change_1h': 1, 'price_change_4h': 4}
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from exchange_client import KLINE_COLUMNS, OPEN_TIME, CLOSE
+from kline_store import KlineStore
+
+STEP = 300_000
+
+
+def candles(start, count):
+    rows = np.zeros((count, KLINE_COLUMNS))
+    rows[:, OPEN_TIME] = (start + np.arange(count)) * STEP
+    rows[:, CLOSE] = start + np.arange(count)
+    return rows
+
+
+def test_contiguous_append(tmp_path):
+    store = KlineStore(str(tmp_path))
+    assert store.append('AAAUSDT', '5m', candles(0, 3)) == 3
+    assert store.append('AAAUSDT', '5m', candles(1, 4)) == 2  # المحفوظ مسبقاً يُتجاهل
+    assert np.asarray(store.read('AAAUSDT', '5m'))[CLOSE].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_gap_rejected(tmp_path):
+    store = KlineStore(str(tmp_path))
+    store.append('AAAUSDT', '5m', candles(0, 3))
+    with pytest.raises(ValueError):
+        store.append('AAAUSDT', '5m', candles(5, 2))
+    assert store.length('AAAUSDT', '5m') == 3
+
+    assert store.append('AAAUSDT', '5m', candles(5, 2), allow_gap=True) == 2
+    assert store.last_open_time('AAAUSDT', '5m') == 6 * STEP
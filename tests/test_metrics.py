@@ -0,0 +1,30 @@
+import glob
+import os
+import re
+
+from advanced_bot import AdvancedTradingBot, BOT_METRICS
+from exchange_client import EXCHANGE_METRICS
+from metrics import Metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_help_lines_rendered():
+    metrics = Metrics()
+    metrics.describe('jobs_total', 'Jobs processed')
+    metrics.increment('jobs_total', kind='a')
+    lines = metrics.render().splitlines()
+    assert lines[:2] == ['# HELP jobs_total Jobs processed', '# TYPE jobs_total counter']
+
+
+def test_every_emitted_metric_is_described():
+    pattern = re.compile(r"\.(?:increment|set_gauge|observe|timer)\('([a-z0-9_]+)'")
+    emitted = set()
+    for path in glob.glob(os.path.join(ROOT, '*.py')):
+        with open(path, encoding='utf-8') as f:
+            emitted.update(pattern.findall(f.read()))
+    assert emitted
+    assert emitted <= set(BOT_METRICS) | set(EXCHANGE_METRICS)
+
+    bot = AdvancedTradingBot(load_symbols=False)
+    assert set(BOT_METRICS) | set(EXCHANGE_METRICS) <= set(bot.metrics.help)
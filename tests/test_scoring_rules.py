@@ -0,0 +1,145 @@
+"""جدول القواعد مقابل نظام النقاط القديم (if/elif) الذي حل محله"""
+import numpy as np
+import pytest
+
+from advanced_bot import AdvancedTradingBot
+from scoring_rules import ScoringRules
+
+
+def legacy_score(indicators):
+    """نظام النقاط كما كان في generate_trading_signal قبل جدول القواعد"""
+    points = 0
+    conditions = []
+
+    if indicators['rsi'] < 25:
+        points += 25
+        conditions.append("RSI شديد التشبع البيعي (<25)")
+    elif indicators['rsi'] < 30:
+        points += 20
+        conditions.append("RSI تشبع بيعي (25-30)")
+    elif indicators['rsi'] < 35:
+        points += 15
+        conditions.append("RSI منخفض (30-35)")
+
+    if indicators['stoch_rsi'] < 20:
+        points += 20
+        conditions.append("Stoch RSI تشبع بيعي (<20)")
+    elif indicators['stoch_rsi'] < 30:
+        points += 15
+        conditions.append("Stoch RSI منخفض (20-30)")
+
+    if indicators['ema_8'] > indicators['ema_21']:
+        points += 15
+        conditions.append("الاتجاه صعودي (EMA8 > EMA21)")
+        if indicators['ema_21'] > indicators['sma_50']:
+            points += 10
+            conditions.append("اتجاه قوي (EMA21 > SMA50)")
+
+    if indicators['macd_histogram'] > 0:
+        points += 10
+        conditions.append("MACD إيجابي")
+        if indicators['macd_histogram'] > indicators['macd_histogram'] * 0.8:
+            points += 5
+            conditions.append("MACD متحسن")
+
+    if indicators['volume_ratio'] > 3.0:
+        points += 20
+        conditions.append("حجم تداول عالي جداً (3x+)")
+    elif indicators['volume_ratio'] > 2.0:
+        points += 15
+        conditions.append("حجم تداول عالي (2x+)")
+    elif indicators['volume_ratio'] > 1.5:
+        points += 10
+        conditions.append("حجم تداول جيد (1.5x+)")
+
+    if indicators['price_change_5m'] > 1.0:
+        points += 10
+        conditions.append("زخم 5 دقائق قوي")
+    elif indicators['price_change_5m'] > 0:
+        points += 5
+        conditions.append("زخم 5 دقائق إيجابي")
+
+    if indicators['price_change_1h'] > 2.0:
+        points += 5
+        conditions.append("اتجاه ساعة صعودي")
+
+    if 2 < indicators['volatility'] < 10:
+        points += 10
+        conditions.append("تقلب مناسب للتداول")
+
+    if points >= 85:
+        level = ("🟢 شراء قوي", "HIGH")
+    elif points >= 75:
+        level = ("🟡 شراء متوسط", "MEDIUM")
+    elif points >= 65:
+        level = ("🔵 شراء ضعيف", "LOW")
+    else:
+        level = None
+    return points, conditions, level
+
+
+def random_indicators(n, seed=11):
+    """قيم حول كل حد (بما فيها الحدود نفسها و NaN لـ sma_50)"""
+    rng = np.random.default_rng(seed)
+    pick = lambda *values: rng.choice(np.array(values, dtype=np.float64), n)
+    ema_21 = rng.uniform(99, 101, n)
+    return {
+        'rsi': np.where(rng.random(n) < 0.3, pick(25, 30, 35), rng.uniform(15, 45, n)),
+        'stoch_rsi': np.where(rng.random(n) < 0.3, pick(20, 30), rng.uniform(0, 40, n)),
+        'ema_8': ema_21 + rng.normal(0, 0.5, n),
+        'ema_21': ema_21,
+        'sma_50': np.where(rng.random(n) < 0.1, np.nan, ema_21 + rng.normal(0, 0.5, n)),
+        'macd_histogram': np.where(rng.random(n) < 0.1, 0.0, rng.normal(0, 1, n)),
+        'volume_ratio': np.where(rng.random(n) < 0.3, pick(1.5, 2.0, 3.0), rng.uniform(0.5, 4, n)),
+        'volatility': np.where(rng.random(n) < 0.2, pick(2, 10), rng.uniform(0, 12, n)),
+        'price_change_5m': np.where(rng.random(n) < 0.2, pick(0, 1), rng.normal(0, 1.5, n)),
+        'price_change_1h': np.where(rng.random(n) < 0.2, pick(2), rng.normal(0, 3, n)),
+        'price_change_4h': rng.normal(0, 5, n),
+    }
+
+
+def test_rule_table_matches_legacy_scoring():
+    rules = ScoringRules.load()
+    matrix = random_indicators(5000)
+    points, masks = rules.evaluate(matrix)
+
+    for i in range(len(points)):
+        indicators = {name: float(values[i]) for name, values in matrix.items()}
+        expected_points, expected_conditions, expected_level = legacy_score(indicators)
+        assert points[i] == expected_points
+        assert rules.conditions(masks, i) == expected_conditions
+        assert rules.classify(points[i]) == expected_level
+
+
+def test_generate_trading_signal_matches_legacy():
+    bot = AdvancedTradingBot(load_symbols=False)
+    matrix = random_indicators(500, seed=5)
+    for i in range(500):
+        indicators = {name: float(values[i]) for name, values in matrix.items()}
+        expected_points, expected_conditions, expected_level = legacy_score(indicators)
+        signal = bot.generate_trading_signal('TESTUSDT', {'current_price': 1.0}, indicators)
+        if expected_level is None:
+            assert signal is None
+        else:
+            assert (signal['signal'], signal['alert_level']) == expected_level
+            assert signal['confidence'] == expected_points
+            assert signal['conditions'] == expected_conditions
+
+
+def test_unknown_operator_rejected():
+    with pytest.raises(ValueError):
+        ScoringRules({'min_points': 10, 'levels': [{'min_points': 10, 'signal': 'x', 'alert_level': 'LOW'}],
+                      'rules': [{'id': 'a', 'indicator': 'rsi', 'op': '==', 'value': 1, 'points': 10, 'text': 'a'}]})
+
+
+def test_levels_must_cover_min_points():
+    rule = {'id': 'a', 'indicator': 'rsi', 'op': '<', 'value': 30, 'points': 20, 'text': 'a'}
+    with pytest.raises(ValueError):
+        ScoringRules({'min_points': 10, 'levels': [{'min_points': 15, 'signal': 'x', 'alert_level': 'LOW'}],
+                      'rules': [rule]})
+    with pytest.raises(ValueError):
+        ScoringRules({'min_points': 10, 'levels': [], 'rules': [rule]})
+
+    rules = ScoringRules({'min_points': 10, 'levels': [{'min_points': 5, 'signal': 'x', 'alert_level': 'LOW'}],
+                          'rules': [rule]})
+    assert rules.classify(10) == ('x', 'LOW')
@@ -0,0 +1,90 @@
+"""البث مقابل stub_stream: الحالة التزايدية بعد قطع الاتصال وسد الفجوة"""
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('websockets')
+
+import advanced_bot
+import stub_stream
+from exchange_client import OPEN_TIME, HIGH, LOW, CLOSE, VOLUME
+from indicators import IncrementalIndicators
+
+REPLAY = 12
+CANDLE_SECONDS = 0.6
+DROP_EVERY = 4
+
+
+class RecordingIndicators(IncrementalIndicators):
+    """تحفظ شموع التهيئة لإعادة بناء الحالة المتوقعة"""
+
+    @classmethod
+    def from_candles(cls, highs, lows, closes, volumes, period=14):
+        state = super().from_candles(highs, lows, closes, volumes, period)
+        state.seed_closes = np.array(closes)
+        return state
+
+
+def expected_state(candles, state):
+    """from_candles على الشموع المحفوظة من بداية تهيئة الحالة حتى آخر شمعة مغلقة"""
+    seed = state.seed_closes
+    for start in range(candles.shape[1] - len(seed) + 1):
+        if np.array_equal(candles[CLOSE, start:start + len(seed)], seed):
+            rows = candles[:, start:]
+            return IncrementalIndicators.from_candles(rows[HIGH], rows[LOW], rows[CLOSE], rows[VOLUME])
+    raise AssertionError("seed candles missing from the cache")
+
+
+@pytest.fixture
+def stream_stub():
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    # تأخير REST يجعل رسائل الإغلاق تتراكم أثناء سد الفجوة بعد كل اشتراك
+    process = context.Process(target=stub_stream.serve, args=(6, 0, 0), daemon=True, kwargs=dict(
+        replay=REPLAY, candle_seconds=CANDLE_SECONDS, drop_every=DROP_EVERY, latency=0.3, ready=ready))
+    process.start()
+    try:
+        yield ready.get(timeout=60)
+    finally:
+        process.terminate()
+        process.join()
+
+
+def test_state_matches_candles_across_reconnects(stream_stub, monkeypatch):
+    http_port, ws_port = stream_stub
+    monkeypatch.setattr(advanced_bot, 'IncrementalIndicators', RecordingIndicators)
+    monkeypatch.setattr(advanced_bot, 'print_signals', lambda signals: None)
+
+    bot = advanced_bot.AdvancedTradingBot(base_url=f"http://127.0.0.1:{http_port}",
+                                          ws_url=f"ws://127.0.0.1:{ws_port}")
+    connects, checked, mismatches = [], [], []
+    backfill = bot.backfill_symbols
+    bot.backfill_symbols = lambda symbols: (connects.append(len(symbols)), backfill(symbols))
+    handle = bot.handle_stream_kline
+
+    def checked_handle(symbol, kline):
+        handle(symbol, kline)
+        state = bot.indicator_states.get(symbol)
+        if not kline['x'] or state is None:
+            return
+        candles = bot.candle_cache.get(symbol, bot.stream_interval).view()
+        closed = candles[:, candles[OPEN_TIME] <= kline['t']]
+        actual, expected = state.snapshot(), expected_state(closed, state).snapshot()
+        checked.append(symbol)
+        if list(state.closes) != list(closed[CLOSE, -len(state.closes):]) or \
+                any(not np.isclose(actual[key], expected[key], equal_nan=True) for key in expected):
+            mismatches.append((symbol, kline['t']))
+
+    bot.handle_stream_kline = checked_handle
+    thread = threading.Thread(target=bot.run_stream, daemon=True)
+    thread.start()
+    time.sleep(REPLAY * CANDLE_SECONDS + 3)
+    bot.streamer.stop()
+    thread.join(timeout=10)
+
+    assert len(connects) >= 3  # التحميل الأولي + أول اشتراك + إعادة اتصال واحدة على الأقل
+    assert checked
+    assert not mismatches
@@ -0,0 +1,161 @@
+"""فواصل زمنية أعلى (15m, 1h, 4h ...) تُشتق محلياً من شموع الفاصل الأساسي
+
+التجميع متجه عبر reduceat: الفتح أول شمعة في الفترة، الإغلاق آخرها، أعلى
+وأدنى سعر عبر maximum/minimum، والحجم مجموعها. بعد أول تجميع لا يُعاد حساب
+إلا الفترة الأخيرة (قيد التكوين) وما بعدها، ومخزن الفاصل الأعلى يحتفظ بالفترات
+المكتملة حتى بعد خروج شموعها الأساسية من مخزن الشموع. لا طلبات شبكة إضافية.
+
+المؤشرات تُضاف بلاحقة الفاصل: rsi_1h, ema_8_1h, macd_histogram_4h ...
+"""
+import threading
+
+import numpy as np
+
+from candle_cache import CandleRingBuffer
+from exchange_client import INTERVAL_MS, KLINE_COLUMNS, OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME
+from indicators import compute_indicator_matrix, MIN_CANDLES
+
+# المؤشرات المتاحة على كل فاصل أعلى
+TIMEFRAME_INDICATORS = ('rsi', 'stoch_rsi', 'ema_8', 'ema_21', 'sma_50', 'macd_histogram',
+                        'volume_ratio', 'volatility')
+
+# عدد الفترات (المكتملة + الحالية) التي تُحسب عليها المؤشرات، ثابت في البوت والاختبار
+# التاريخي: هو ما يتوفر منذ التشغيل (required_candles) فلا تتغير القيم مع نمو المخزن
+TIMEFRAME_WINDOW = MIN_CANDLES + 1
+
+
+def resample(candles, target_ms):
+    """تجميع شموع (6 × n) مرتبة إلى فترات target_ms (6 × m)؛ الفترة الأولى الناقصة تُحذف"""
+    open_times = candles[OPEN_TIME]
+    if not len(open_times):
+        return np.empty((KLINE_COLUMNS, 0), dtype=np.float64)
+
+    buckets = open_times // target_ms
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.append(starts[1:], len(open_times)) - 1
+
+    result = np.empty((KLINE_COLUMNS, len(starts)), dtype=np.float64)
+    result[OPEN_TIME] = buckets[starts] * target_ms
+    result[OPEN] = candles[OPEN, starts]
+    result[HIGH] = np.maximum.reduceat(candles[HIGH], starts)
+    result[LOW] = np.minimum.reduceat(candles[LOW], starts)
+    result[CLOSE] = candles[CLOSE, ends]
+    result[VOLUME] = np.add.reduceat(candles[VOLUME], starts)
+
+    # الفترة الأولى تبدأ من منتصفها (شموعها الأولى خارج المخزن)
+    if open_times[0] != result[OPEN_TIME, 0]:
+        result = result[:, 1:]
+    return result
+
+
+def parse_timeframe(name):
+    """('rsi', '1h') لاسم مثل rsi_1h، أو None إذا لم يكن مؤشراً على فاصل أعلى"""
+    base, _, interval = name.rpartition('_')
+    if base in TIMEFRAME_INDICATORS and interval in INTERVAL_MS:
+        return base, interval
+    return None
+
+
+def required_candles(base_interval, timeframes, lookback=MIN_CANDLES):
+    """عدد الشموع الأساسية اللازمة لتكوين lookback فترة مكتملة على كل فاصل"""
+    ratios = [INTERVAL_MS[timeframe] // INTERVAL_MS[base_interval] for timeframe in timeframes]
+    return max(((lookback + 1) * ratio for ratio in ratios), default=0)
+
+
+class TimeframeCache:
+    """مخازن الفواصل الأعلى لكل (عملة، فاصل أساسي، فاصل أعلى)"""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def get(self, symbol, base_interval, interval):
+        key = (symbol, base_interval, interval)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            with self.lock:
+                buffer = self.buffers.setdefault(key, CandleRingBuffer(self.capacity))
+        return buffer
+
+    def update(self, symbol, base_interval, interval, base_candles):
+        """تحديث الفاصل الأعلى من شموع الفاصل الأساسي (6 × n) وإرجاع آخر فتراته (6 × m)"""
+        buffer = self.get(symbol, base_interval, interval)
+        target_ms = INTERVAL_MS[interval]
+        last = buffer.last_open_time()
+
+        if last is not None:
+            open_times = base_candles[OPEN_TIME]
+            if len(open_times) and open_times[0] <= last:
+                # إعادة حساب الفترة الأخيرة فقط (قد تكون اكتملت أو ما زالت تتكوّن) وما بعدها
+                base_candles = base_candles[:, np.searchsorted(open_times, last):]
+            else:
+                buffer.clear()  # فجوة أكبر من مخزن الشموع الأساسية
+
+        buffer.update(resample(base_candles, target_ms).T)
+        return buffer.view()
+
+    def indicator_matrix(self, symbols, base_interval, interval, candle_views):
+        """مؤشرات الفاصل الأعلى على آخر TIMEFRAME_WINDOW فترة (NaN للعملات التي لم تكتمل فتراتها بعد)"""
+        views = [self.update(symbol, base_interval, interval, candles)
+                 for symbol, candles in zip(symbols, candle_views)]
+
+        result = {name: np.full(len(symbols), np.nan) for name in TIMEFRAME_INDICATORS}
+        indices = [i for i, candles in enumerate(views) if candles.shape[1] >= TIMEFRAME_WINDOW]
+        if indices:
+            matrix = compute_indicator_matrix(*[
+                np.stack([views[i][column, -TIMEFRAME_WINDOW:] for i in indices])
+                for column in (CLOSE, HIGH, LOW, VOLUME)
+            ])
+            for name in TIMEFRAME_INDICATORS:
+                result[name][indices] = matrix[name]
+
+        return {f"{name}_{interval}": values for name, values in result.items()}
+
+
+def timeframe_series(candles, base_interval, interval, window=TIMEFRAME_WINDOW, chunk=4096):
+    """مؤشرات فاصل أعلى عند كل شمعة أساسية كما يراها البوت بعد إغلاقها (للاختبار التاريخي)
+
+    نافذة كل شمعة هي نافذة TimeframeCache في البوت: آخر window-1 فترة مكتملة
+    ثم الفترة الحالية مجمّعة حتى هذه الشمعة فقط (بدون نظر للمستقبل). القيم NaN
+    قبل توفر window فترة. المفاتيح بلاحقة الفاصل مثل rsi_1h.
+    """
+    target_ms = INTERVAL_MS[interval]
+    open_times = np.asarray(candles[OPEN_TIME])
+    n = len(open_times)
+    result = {f"{name}_{interval}": np.full(n, np.nan) for name in TIMEFRAME_INDICATORS}
+    buckets = resample(np.asarray(candles), target_ms)
+    if not n or not buckets.shape[1]:
+        return result
+
+    # فترة كل شمعة أساسية (-1 للشموع في الفترة الأولى الناقصة التي حذفها resample)
+    bucket_starts = open_times // target_ms * target_ms
+    position = np.searchsorted(buckets[OPEN_TIME], bucket_starts)
+    position[(position >= buckets.shape[1]) | (buckets[OPEN_TIME, np.minimum(position, buckets.shape[1] - 1)]
+                                                != bucket_starts)] = -1
+
+    # الفترة قيد التكوين حتى كل شمعة: أعلى/أدنى تراكمي ومجموع الحجم داخل الفترة
+    first = np.flatnonzero(np.concatenate([[True], bucket_starts[1:] != bucket_starts[:-1]]))
+    offset = np.arange(n) - np.repeat(first, np.diff(np.append(first, n)))
+    highs = np.array(candles[HIGH], dtype=np.float64)
+    lows = np.array(candles[LOW], dtype=np.float64)
+    volumes = np.array(candles[VOLUME], dtype=np.float64)
+    for step in range(1, offset.max() + 1):
+        rows = np.flatnonzero(offset == step)
+        highs[rows] = np.maximum(highs[rows], highs[rows - 1])
+        lows[rows] = np.minimum(lows[rows], lows[rows - 1])
+        volumes[rows] += volumes[rows - 1]
+    current = {CLOSE: np.asarray(candles[CLOSE], dtype=np.float64), HIGH: highs, LOW: lows, VOLUME: volumes}
+
+    ready = np.flatnonzero(position >= window - 1)
+    history = np.arange(-(window - 1), 0)
+    for start in range(0, len(ready), chunk):
+        rows = ready[start:start + chunk]
+        previous = position[rows, None] + history
+        matrix = compute_indicator_matrix(*[
+            np.concatenate([buckets[column][previous], current[column][rows, None]], axis=1)
+            for column in (CLOSE, HIGH, LOW, VOLUME)
+        ])
+        for name in TIMEFRAME_INDICATORS:
+            result[f"{name}_{interval}"][rows] = matrix[name]
+    return result